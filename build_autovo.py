@@ -1,15 +1,30 @@
 #!/usr/bin/env python3
+import os
 import re
+import bisect
+import mmap
+import functools
+import itertools
 import random
 import shutil
+import struct
 import subprocess
+import threading
 import wave
-import array
 import json
+import dataclasses
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import sys
 
+import numpy as np
+
+try:
+    import orjson  # optional: faster vo_lines.json writes
+except ImportError:
+    orjson = None
+
 # ==============================
 # GLOBAL FLAGS
 # ==============================
@@ -47,6 +62,24 @@ PROMPT_TEXT_FALLBACK = (
 
 VOXCMD = "voxcpm"
 
+# Load VoxCPM once inside this process (it already runs in the VoxCPM venv)
+# instead of paying interpreter start-up + model load for every VOXCMD call.
+# Falls back to VOXCMD automatically when the voxcpm package is not importable
+# or the model fails to load. VOX_MODEL_ID = None keeps VoxCPM's own default
+# model; set it to pin one, and both paths use it (VOXCMD gets it as
+# --hf-model-id), so the voice doesn't depend on which one ran.
+VOX_IN_PROCESS = True
+VOX_MODEL_ID = None
+
+# Let VoxCPM torch.compile its decoder once at load so every later line
+# reuses the compiled graph. Costs a slower first load; turn off if the
+# local torch build has no working compiler backend.
+VOX_OPTIMIZE = True
+
+# How many seed/CFG chunks may run VoxCPM at once. Every process loads its own
+# copy of the model, so raise this only when the GPU has memory to spare.
+VOX_PARALLEL = 1
+
 INFERENCE_STEPS = 15
 USE_NORMALIZE = True
 USE_DENOISE = True
@@ -82,6 +115,36 @@ PHONETIC_FIXES = [
     ("MOST", "most"),
 ]
 
+# All PHONETIC_FIXES folded into one case-insensitive alternation, so a
+# string is scanned once instead of once per fix. Longest first, so a fix
+# that is a prefix of another can't shadow it.
+_PHONETIC_MAP = {src.lower(): repl for src, repl in PHONETIC_FIXES if src}
+_PHONETIC_RE = re.compile(
+    r"\b(" + "|".join(re.escape(src) for src in sorted(_PHONETIC_MAP, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+
+# ==============================
+# PRECOMPILED PATTERNS
+# ==============================
+
+# Either: word <space> dash(es) <space> word, or a standalone dash token
+# not touching word chars. Both become ", ".
+_DASH_RE = re.compile(r'(?<=\w)\s+[-–—]+\s+(?=\w)|(?<!\w)\s*[-–—]+\s*(?!\w)')
+_QUOTE_RE = re.compile(r'"([^"]+)"')
+_STAR_RE = re.compile(r"\*(.*?)\*")
+_NNOTE_RE = re.compile(r"^\^NNOTE:\s*")
+_TAG_PREFIX_RE = re.compile(r"^\^[A-Za-z0-9_\-]+:?\s*")
+_ANGLE_TAG_RE = re.compile(r"<[^>]+>")
+_DOT_ONLY_RE = re.compile(r"[.\-–—…\s]+")
+# [^~]* rather than a lazy .*?: same match, but no per-byte backtracking
+_TLK_ENTRY_RE = re.compile(rb"@(\d+)\s*=\s*~([^~]*)~")
+_DLG_TOKEN_RE = re.compile(r"\b([A-Za-z0-9_]+)\.DLG\b", re.IGNORECASE)
+_VARIANT_SUFFIX_RE = re.compile(r"[A-Z0-9]")
+_WEIDU_STRING_RE = re.compile(r"~.*?~\s*\[([^\]]+)\]", re.DOTALL)
+_SAY_RE = re.compile(rb"\bSAY\s+@(\d+)", re.IGNORECASE)
+_TRA_ENTRY_RE = re.compile(rb"@(\d+)\s*=\s*#(\d+)\s*/\*\s*~(.*?)~.*?\*/", re.DOTALL)
+
 # ==============================
 # DLG-SPECIFIC GLOBALS (SET AT RUNTIME)
 # ==============================
@@ -89,6 +152,8 @@ PHONETIC_FIXES = [
 DLG_NAME: str | None = None
 DLG_BASENAME: str | None = None
 VOICE_PREFIX: str | None = None
+# First two chars of VOICE_PREFIX (X-padded); every generated resref starts with it
+RESREF_PREFIX: str | None = None
 
 REF_AUDIO_DIR: Path | None = None
 
@@ -101,135 +166,38 @@ LOG_PATH: Path | None = None
 TLK_TRA_FILE: Path | None = None
 
 _SOUNDREF_CACHE: dict[int, str | None] = {}
+# True once dialog.tlk's whole entry table is in _SOUNDREF_CACHE
+_SOUNDREF_TABLE_LOADED = False
 _DECOMPILED_CREATED: set[str] = set()
+_DECOMPILED_LOCK = threading.Lock()
+_LOG_LOCK = threading.Lock()
 
 # ==============================
-# VIEWER SCRIPT TEMPLATE
+# VOICED LINE RECORD
 # ==============================
 
-VIEWER_SCRIPT_TEMPLATE = r'''#!/usr/bin/env python3
-import json
-import os
-import sys
-import pathlib
-import platform
-import subprocess
-import tkinter as tk
-from tkinter import ttk, messagebox
-
-HERE = pathlib.Path(__file__).resolve().parent
-META_PATH = HERE / "vo_lines.json"
-
-def load_metadata():
-    if not META_PATH.is_file():
-        messagebox.showerror("Error", f"Metadata file not found: {META_PATH}")
-        sys.exit(1)
-    with META_PATH.open("r", encoding="utf-8") as f:
-        return json.load(f)
-
-def play_wav(path):
-    path = str(path)
-    if not os.path.isfile(path):
-        messagebox.showerror("Playback error", f"WAV not found: {path}")
-        return
-    system = platform.system()
-    if system == "Windows":
-        try:
-            import winsound
-            winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
-            return
-        except Exception as e:
-            messagebox.showerror("Playback error", str(e))
-            return
-    else:
-        for cmd in (["aplay", path], ["paplay", path], ["ffplay", "-nodisp", "-autoexit", path]):
-            try:
-                subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                return
-            except FileNotFoundError:
-                continue
-        messagebox.showerror("Playback error", "No suitable audio player found (tried aplay, paplay, ffplay).")
-
-def main():
-    try:
-        data = load_metadata()
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to load metadata: {e}")
-        return
-
-    entries = data.get("entries", [])
-    root = tk.Tk()
-    root.title(f"Auto-VO Preview - {data.get('dlg_basename', '')}")
-
-    main_frame = ttk.Frame(root, padding=10)
-    main_frame.grid(row=0, column=0, sticky="nsew")
-    root.rowconfigure(0, weight=1)
-    root.columnconfigure(0, weight=1)
-
-    list_frame = ttk.Frame(main_frame)
-    list_frame.grid(row=0, column=0, sticky="nsew")
-    main_frame.rowconfigure(0, weight=1)
-    main_frame.columnconfigure(0, weight=1)
-
-    listbox = tk.Listbox(list_frame, height=20, exportselection=False)
-    scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=listbox.yview)
-    listbox.configure(yscrollcommand=scrollbar.set)
-    listbox.grid(row=0, column=0, sticky="nsew")
-    scrollbar.grid(row=0, column=1, sticky="ns")
-    list_frame.rowconfigure(0, weight=1)
-    list_frame.columnconfigure(0, weight=1)
-
-    detail = tk.Text(main_frame, width=80, height=8, wrap="word")
-    detail.grid(row=1, column=0, sticky="ew", pady=(8, 0))
-
-    btn_frame = ttk.Frame(main_frame)
-    btn_frame.grid(row=2, column=0, sticky="ew", pady=(8, 0))
-    btn_frame.columnconfigure(0, weight=0)
-    btn_frame.columnconfigure(1, weight=1)
-
-    def populate():
-        listbox.delete(0, tk.END)
-        for idx, entry in enumerate(entries):
-            txt = (entry.get("text") or "").replace("\n", " ")
-            if len(txt) > 80:
-                txt = txt[:77] + "..."
-            label = f"{idx+1:03d} | {entry.get('resref')} | strref {entry.get('strref')} | {txt}"
-            listbox.insert(tk.END, label)
-
-    def on_select(event=None):
-        sel = listbox.curselection()
-        if not sel:
-            return
-        entry = entries[sel[0]]
-        text = entry.get("text") or ""
-        detail.delete("1.0", tk.END)
-        detail.insert("1.0", text)
-
-    def on_play():
-        sel = listbox.curselection()
-        if not sel:
-            messagebox.showinfo("No selection", "Select a line to play.")
-            return
-        entry = entries[sel[0]]
-        wav_rel = entry.get("wav")
-        if not wav_rel:
-            messagebox.showerror("Playback error", "No WAV path in metadata.")
-            return
-        wav_path = HERE / wav_rel
-        play_wav(wav_path)
-
-    listbox.bind("<<ListboxSelect>>", on_select)
-    listbox.bind("<Double-Button-1>", lambda e: on_play())
+@dataclasses.dataclass(slots=True)
+class VoicedLine:
+    """
+    One SAY line / TLK strref we voice. Built by build_lines (and cloned by
+    expand_duplicates), then carried through planning, synthesis and TP2.
+    """
+    strref: int
+    text: str
+    tts_text: str
+    resref: str
+    tra_id: int | None = None
+    seed_key: str | None = None
+    cfg_override: float | None = None
+    steps_override: int | None = None
 
-    play_btn = ttk.Button(btn_frame, text="Play", command=on_play)
-    play_btn.grid(row=0, column=0, sticky="w")
 
-    populate()
-    root.mainloop()
+# ==============================
+# VIEWER SCRIPT
+# ==============================
 
-if __name__ == "__main__":
-    main()
-'''
+# Tk preview helper shipped next to this script and copied into MOD_DIR
+VIEWER_SCRIPT_SRC = Path(__file__).with_name("viewer_script.py")
 
 # ==============================
 # RUNTIME DLG SETUP
@@ -239,7 +207,7 @@ def setup_dlg(dlg_name_raw: str):
     """
     Initialize all DLG-specific globals from a user-provided DLG name.
     """
-    global DLG_NAME, DLG_BASENAME, VOICE_PREFIX
+    global DLG_NAME, DLG_BASENAME, VOICE_PREFIX, RESREF_PREFIX
     global REF_AUDIO_DIR, MOD_ID, MOD_DIR, SOUNDS_DIR, INPUT_TXT, TMP_OUT_DIR, LOG_PATH, TLK_TRA_FILE
 
     dlg = dlg_name_raw.strip()
@@ -258,6 +226,7 @@ def setup_dlg(dlg_name_raw: str):
     if vp.startswith("D") and len(vp) > 1 and vp[1].isalpha():
         vp = vp[1:]
     VOICE_PREFIX = vp
+    RESREF_PREFIX = (VOICE_PREFIX.upper() + "XX")[:2]
 
     # Voice ref dir selection
     dlg_folder = DLG_BASENAME.lower() + "_refs"
@@ -304,8 +273,34 @@ def setup_dlg(dlg_name_raw: str):
 # HELPERS
 # ==============================
 
-# Cache of all DLG resource names discovered via WeiDU --list-files
+# Cache of all DLG resource names discovered via WeiDU --list-files.
+# Also persisted to DLG_RESOURCE_CACHE_FILE, keyed by CHITIN.KEY (size, mtime).
 _DLG_RESOURCE_CACHE: list[str] | None = None
+DLG_RESOURCE_CACHE_FILE = AUTOVO_ROOT / ".dlg_resources.json"
+
+# Decompiled <basename>.D / .TRA kept across runs, one pair per basename,
+# with a <basename>.json recording what they were decompiled from.
+DECOMPILE_CACHE_DIR = AUTOVO_ROOT / ".dlg_cache"
+
+
+def file_stamp(*paths: Path) -> list[int] | None:
+    """
+    (size, mtime_ns) of the first of paths that exists, or None.
+    """
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        return [st.st_size, st.st_mtime_ns]
+    return None
+
+
+def chitin_key_stamp() -> list[int] | None:
+    """
+    (size, mtime_ns) of GAME_DIR's CHITIN.KEY, or None if it can't be found.
+    """
+    return file_stamp(GAME_DIR / "chitin.key", GAME_DIR / "CHITIN.KEY")
 
 
 def list_all_dlg_resources_via_weidu() -> list[str]:
@@ -320,6 +315,18 @@ def list_all_dlg_resources_via_weidu() -> list[str]:
     if _DLG_RESOURCE_CACHE is not None:
         return _DLG_RESOURCE_CACHE
 
+    stamp = chitin_key_stamp()
+    if stamp is not None and DLG_RESOURCE_CACHE_FILE.is_file():
+        try:
+            cached = json.loads(DLG_RESOURCE_CACHE_FILE.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            cached = None
+        if isinstance(cached, dict) and cached.get("key") == stamp and isinstance(cached.get("names"), list):
+            # find_dlg_variants bisects this list, so never trust the file's order
+            _DLG_RESOURCE_CACHE = sorted(cached["names"])
+            print(f"[DEBUG] DLG resources loaded from {DLG_RESOURCE_CACHE_FILE}: {len(_DLG_RESOURCE_CACHE)}")
+            return _DLG_RESOURCE_CACHE
+
     if not WEIDU_EXE:
         raise SystemExit("WEIDU_EXE not configured; cannot list DLG resources.")
 
@@ -331,39 +338,53 @@ def list_all_dlg_resources_via_weidu() -> list[str]:
     print(f"[DEBUG] Running WeiDU to list all resources (for DLG discovery):")
     print("       " + " ".join(cmd))
 
+    # Stream the (multi-MB) listing and parse it as WeiDU produces it,
+    # rather than buffering all of stdout+stderr first.
+    names: set[str] = set()
+    saw_output = False
     try:
-        proc = subprocess.run(
+        proc = subprocess.Popen(
             cmd,
             cwd=str(GAME_DIR),
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            check=False,
+            errors="replace",
+            bufsize=1,
         )
     except FileNotFoundError:
         raise SystemExit(f"WeiDU not found at {WEIDU_EXE}")
 
-    out = (proc.stdout or "") + (proc.stderr or "")
-    if proc.returncode != 0 and not out.strip():
+    with proc:
+        for line in proc.stdout:
+            if not saw_output and line.strip():
+                saw_output = True
+            # Be generous: grab any token ending in .DLG
+            for m in _DLG_TOKEN_RE.finditer(line):
+                names.add(m.group(1).upper())
+
+    if proc.returncode != 0 and not saw_output:
         raise SystemExit(
             f"WeiDU --list-files failed with exit code {proc.returncode} "
             f"and no output; cannot discover DLG resources."
         )
 
-    names: set[str] = set()
-    for line in out.splitlines():
-        # Be generous: grab any token ending in .DLG
-        m = re.search(r"\b([A-Za-z0-9_]+)\.DLG\b", line, flags=re.IGNORECASE)
-        if not m:
-            continue
-        resname = m.group(1).upper()
-        names.add(resname)
-
     if not names:
         print("[WARN] WeiDU --list-files produced no .DLG entries; "
               "variant discovery will fall back to base name only.")
 
     _DLG_RESOURCE_CACHE = sorted(names)
     print(f"[DEBUG] WeiDU DLG resources discovered: {len(_DLG_RESOURCE_CACHE)}")
+
+    if stamp is not None and names:
+        try:
+            DLG_RESOURCE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            DLG_RESOURCE_CACHE_FILE.write_text(
+                json.dumps({"key": stamp, "names": _DLG_RESOURCE_CACHE}), encoding="utf-8"
+            )
+        except OSError as e:
+            print(f"[WARN] Failed to write {DLG_RESOURCE_CACHE_FILE}: {e}")
+
     return _DLG_RESOURCE_CACHE
 
 
@@ -386,16 +407,18 @@ def find_dlg_variants(base_name: str) -> list[str]:
     base = base_name.upper()
     all_dlg = list_all_dlg_resources_via_weidu()
 
+    # all_dlg is sorted, so every name starting with base is one contiguous run
     variants: set[str] = set()
-    for name in all_dlg:
+    for i in range(bisect.bisect_left(all_dlg, base), len(all_dlg)):
+        name = all_dlg[i]
         if not name.startswith(base):
-            continue
+            break
         suffix = name[len(base):]  # may be ""
         if not suffix:
             variants.add(name)
             continue
         # Only accept a single trailing letter/number as a variant
-        if len(suffix) == 1 and re.fullmatch(r"[A-Z0-9]", suffix):
+        if len(suffix) == 1 and _VARIANT_SUFFIX_RE.fullmatch(suffix):
             variants.add(name)
 
     if not variants:
@@ -406,20 +429,37 @@ def find_dlg_variants(base_name: str) -> list[str]:
     return variants_list
 
 
-def list_dlg_basenames():
+def dump_json_bytes(data) -> bytes:
     """
-    Return a sorted list of all .DLG basenames found in GAME_DIR.
+    Pretty-printed (2-space) UTF-8 JSON, via orjson when it is installed.
+    Both paths give the same text for the str/int payloads we write.
     """
-    basenames = []
-    for path in GAME_DIR.iterdir():
-        if path.is_file() and path.suffix.lower() == ".dlg":
-            basenames.append(path.stem.upper())
-    basenames.sort()
-    return basenames
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
 
 
-def load_text(path: Path, encoding: str = "cp1252") -> str:
-    return path.read_text(encoding=encoding, errors="replace")
+def iter_file_matches(path: Path, pattern: re.Pattern):
+    """
+    Yield pattern.finditer() matches over the raw bytes of `path` through an
+    mmap, so the file is never read or decoded as one big string. `pattern`
+    must be a bytes pattern; decode the captured groups as needed.
+    """
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from pattern.finditer(mm)
+
+
+def decode_weidu_text(raw: bytes) -> str:
+    """
+    Decode a ~text~ group captured from a WeiDU .TRA. WeiDU.exe writes CRLF,
+    and the raw mmap bytes skip read_text's universal-newline translation,
+    so line breaks are folded to "\n" here.
+    """
+    text = raw.decode("cp1252", errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
 
 
 def save_text(path: Path, text: str, encoding: str = "cp1252") -> None:
@@ -427,9 +467,29 @@ def save_text(path: Path, text: str, encoding: str = "cp1252") -> None:
     path.write_text(text, encoding=encoding, errors="replace")
 
 
+_DBG_BUF: list[str] = []
+_DBG_FLUSH_EVERY = 64
+
+
+def _dbg(msg: str):
+    """
+    Buffered [DEBUG] print for per-line messages in hot loops. Call
+    flush_dbg() when the loop ends, and before any input() or other print.
+    """
+    _DBG_BUF.append(f"[DEBUG] {msg}\n")
+    if len(_DBG_BUF) >= _DBG_FLUSH_EVERY:
+        flush_dbg()
+
+
+def flush_dbg():
+    if _DBG_BUF:
+        sys.stdout.write("".join(_DBG_BUF))
+        _DBG_BUF.clear()
+
+
 def append_log(line: str):
     MOD_DIR.mkdir(parents=True, exist_ok=True)
-    with LOG_PATH.open("a", encoding="utf-8") as f:
+    with _LOG_LOCK, LOG_PATH.open("a", encoding="utf-8") as f:
         f.write(line + "\n")
 
 
@@ -439,6 +499,24 @@ def init_run_log():
         f.write(f"Auto-VO run for {DLG_BASENAME} at {datetime.now().isoformat()}\n")
 
 
+def fast_copy(src: Path, dst: Path):
+    """
+    Copy src to dst as a reflink (copy-on-write clone) where the filesystem
+    supports it, falling back to shutil.copy2.
+
+    Deliberately no hardlinks: WeiDU rewrites dialog.tlk in place, which
+    would silently change every linked "backup" along with it.
+    """
+    if os.name == "posix" and shutil.which("cp"):
+        proc = subprocess.run(
+            ["cp", "--reflink=auto", "--preserve=mode,timestamps", str(src), str(dst)],
+            capture_output=True,
+        )
+        if proc.returncode == 0:
+            return
+    shutil.copy2(src, dst)
+
+
 def ensure_base_dialog_backup_and_restore():
     dialog_tlk = GAME_DIR / "lang" / WEIDU_LANG / "dialog.tlk"
     if not dialog_tlk.is_file():
@@ -449,12 +527,12 @@ def ensure_base_dialog_backup_and_restore():
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     snapshot_path = backup_dir / f"dialog_{timestamp}.tlk"
-    shutil.copy2(dialog_tlk, snapshot_path)
+    fast_copy(dialog_tlk, snapshot_path)
     print(f"[DEBUG] Snapshot of current dialog.tlk saved to {snapshot_path}")
 
     base_backup = backup_dir / "dialog_base.tlk"
     if not base_backup.exists():
-        shutil.copy2(dialog_tlk, base_backup)
+        fast_copy(dialog_tlk, base_backup)
         print(f"[DEBUG] Created baseline dialog.tlk backup at {base_backup}")
     else:
         shutil.copy2(base_backup, dialog_tlk)
@@ -462,9 +540,9 @@ def ensure_base_dialog_backup_and_restore():
 
 
 def normalize_text_for_match(text: str) -> str:
-    t = text.replace("\r\n", "\n")
-    t = re.sub(r"\s+", " ", t).strip()
-    return t
+    # str.split() splits on exactly the characters \s matches (newlines
+    # included) and drops the ends, so this collapses and strips in one pass.
+    return " ".join(text.split())
 
 
 def normalize_dashes_for_tts(text: str) -> str:
@@ -476,42 +554,33 @@ def normalize_dashes_for_tts(text: str) -> str:
       "journal - though"  -> "journal, though"
       " -- "              -> ", "
     """
-    # word <space> dash(es) <space> word  -> comma between words
-    text = re.sub(r'(?<=\w)\s+[-–—]+\s+(?=\w)', ', ', text)
-
-    # standalone dash tokens not touching word chars -> comma
-    text = re.sub(r'(?<!\w)\s*[-–—]+\s*(?!\w)', ', ', text)
-
-    return text
+    # One pass for both cases:
+    #   word <space> dash(es) <space> word  -> comma between words
+    #   standalone dash tokens not touching word chars -> comma
+    return _DASH_RE.sub(', ', text)
 
 
 def apply_phonetic_fixes(text: str) -> str:
-    result = text
-    for src, repl in PHONETIC_FIXES:
-        if not src:
-            continue
-        pattern = r"\b" + re.escape(src) + r"\b"
-        result = re.sub(pattern, repl, result, flags=re.IGNORECASE)
-    return result
+    return _PHONETIC_RE.sub(lambda m: _PHONETIC_MAP[m.group(1).lower()], text)
 
 
+@functools.lru_cache(maxsize=4096)
 def clean_for_tts(text: str) -> str:
     """
     Character TTS cleaner.
     """
     t = text.strip()
 
-    quote_segments = re.findall(r'"([^"]+)"', t)
+    quote_segments = _QUOTE_RE.findall(t)
     if quote_segments:
         t = " ".join(quote_segments)
     else:
         if t.startswith('"') and t.endswith('"'):
             t = t[1:-1].strip()
 
-    t = re.sub(r"\*(.*?)\*", r"\1", t)
+    t = _STAR_RE.sub(r"\1", t)
     t = normalize_dashes_for_tts(t)
-    t = t.replace("\r\n", " ").replace("\n", " ")
-    t = re.sub(r"\s+", " ", t).strip()
+    t = " ".join(t.split())
     t = apply_phonetic_fixes(t)
     return t
 
@@ -523,26 +592,61 @@ def clean_segment_for_tts(text: str) -> str:
     t = text.strip()
 
     # Strip note prefixes like ^NNOTE:
-    t = re.sub(r"^\^NNOTE:\s*", "", t)
-    t = re.sub(r"^\^[A-Za-z0-9_\-]+:?\s*", "", t)
+    t = _NNOTE_RE.sub("", t)
+    t = _TAG_PREFIX_RE.sub("", t)
 
     # Strip engine tags like <BANDAGES2> etc.
-    t = re.sub(r"<[^>]+>", "", t)
+    t = _ANGLE_TAG_RE.sub("", t)
 
-    t = re.sub(r"\*(.*?)\*", r"\1", t)
+    t = _STAR_RE.sub(r"\1", t)
     t = normalize_dashes_for_tts(t)
-    t = t.replace("\r\n", " ").replace("\n", " ")
-    t = re.sub(r"\s+", " ", t).strip()
+    t = " ".join(t.split())
 
     if not t:
         return ""
-    if re.fullmatch(r"[.\-–—…\s]+", t):
+    if _DOT_ONLY_RE.fullmatch(t):
         return ""
 
     t = apply_phonetic_fixes(t)
     return t
 
 
+# NumPy sample type per WAV sample width (8-bit WAV PCM is unsigned, centred on 128)
+_PCM_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+def scale_pcm(block: bytes, ramp, sampwidth: int, nchannels: int) -> bytes:
+    """
+    Multiply interleaved PCM frames in `block` by a per-frame `ramp`
+    (shape (nframes, 1)) and return the scaled bytes.
+    """
+    dtype = _PCM_DTYPES[sampwidth]
+    samples = np.frombuffer(block, dtype=dtype).reshape(-1, nchannels)
+    if sampwidth == 1:
+        centred = samples.astype(np.float32) - 128.0
+        return (centred * ramp + 128.0).astype(np.uint8).tobytes()
+    if sampwidth == 4:
+        # float32 can't represent every int32 sample; scale in double
+        ramp = ramp.astype(np.float64)
+    return (samples * ramp).astype(dtype).tobytes()
+
+
+@functools.lru_cache(maxsize=8)
+def fade_ramp(nframes: int, rising: bool):
+    """
+    Linear (nframes, 1) float32 gain ramp, 0 -> 1 if rising else 1 -> 0,
+    broadcastable over any channel count. Every clip at the pipeline's
+    sample rate shares the same two ramps, so they are built once.
+    """
+    if rising:
+        ramp = np.linspace(0.0, 1.0, nframes, endpoint=False, dtype=np.float32)
+    else:
+        ramp = np.linspace(1.0, 0.0, nframes, endpoint=False, dtype=np.float32)
+    ramp = ramp[:, None]
+    ramp.setflags(write=False)
+    return ramp
+
+
 def apply_fade_in_out(wav_path: Path, fade_in_ms: int = FADE_IN_MS, fade_out_ms: int = FADE_OUT_MS):
     if fade_in_ms <= 0 and fade_out_ms <= 0:
         return
@@ -558,17 +662,15 @@ def apply_fade_in_out(wav_path: Path, fade_in_ms: int = FADE_IN_MS, fade_out_ms:
         comptype = params.comptype
         compname = params.compname
 
-        if sampwidth != 2 or comptype != "NONE":
+        if sampwidth not in _PCM_DTYPES or comptype != "NONE":
             print(f"[DEBUG] Skipping fade on {wav_path.name}: unsupported format "
                   f"(sampwidth={sampwidth}, comptype={comptype})")
             return
 
         raw = w.readframes(nframes)
 
-    samples = array.array("h")
-    samples.frombytes(raw)
-
-    total_frames = nframes
+    frame_bytes = nchannels * sampwidth
+    total_frames = len(raw) // frame_bytes
     if total_frames == 0:
         return
 
@@ -581,31 +683,42 @@ def apply_fade_in_out(wav_path: Path, fade_in_ms: int = FADE_IN_MS, fade_out_ms:
     if fade_out_frames > half:
         fade_out_frames = half
 
-    for i in range(fade_in_frames):
-        factor = i / float(fade_in_frames) if fade_in_frames > 0 else 1.0
-        for c in range(nchannels):
-            idx = i * nchannels + c
-            if idx >= len(samples):
-                break
-            samples[idx] = int(samples[idx] * factor)
+    # Only the faded head/tail are decoded and rescaled; the rest of the
+    # clip is written back as the original raw bytes.
+    head_end = fade_in_frames * frame_bytes
+    tail_start = (total_frames - fade_out_frames) * frame_bytes
+    head = raw[:head_end]
+    tail = raw[tail_start:]
 
-    for i in range(fade_out_frames):
-        factor = (fade_out_frames - i) / float(fade_out_frames) if fade_out_frames > 0 else 1.0
-        frame_index = total_frames - fade_out_frames + i
-        if frame_index < 0:
-            continue
-        for c in range(nchannels):
-            idx = frame_index * nchannels + c
-            if idx >= len(samples):
-                break
-            samples[idx] = int(samples[idx] * factor)
+    if fade_in_frames > 0:
+        head = scale_pcm(head, fade_ramp(fade_in_frames, True), sampwidth, nchannels)
+    if fade_out_frames > 0:
+        tail = scale_pcm(tail, fade_ramp(fade_out_frames, False), sampwidth, nchannels)
 
     with wave.open(str(wav_path), "wb") as out:
         out.setnchannels(nchannels)
         out.setsampwidth(sampwidth)
         out.setframerate(framerate)
         out.setcomptype(comptype, compname)
-        out.writeframes(samples.tobytes())
+        out.writeframesraw(head)
+        out.writeframesraw(memoryview(raw)[head_end:tail_start])
+        out.writeframes(tail)
+
+
+def batch_apply_fades(wav_paths: list[Path]):
+    """
+    apply_fade_in_out over many WAVs at once. The work is file I/O plus a
+    NumPy multiply, both of which release the GIL, so a thread pool scales.
+    """
+    if not wav_paths:
+        return
+    workers = min(len(wav_paths), os.cpu_count() or 1)
+    if workers <= 1:
+        for p in wav_paths:
+            apply_fade_in_out(p)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(apply_fade_in_out, wav_paths))
 
 
 # ==============================
@@ -613,19 +726,26 @@ def apply_fade_in_out(wav_path: Path, fade_in_ms: int = FADE_IN_MS, fade_out_ms:
 # ==============================
 
 def load_seeds():
+    """
+    Returns (seeds, seeds_by_key, baseline_seed) for the current DLG's
+    REF_AUDIO_DIR, the key index built while the seeds are collected.
+    """
     if REF_AUDIO_DIR is None:
         raise SystemExit("REF_AUDIO_DIR not initialized (call setup_dlg first).")
 
     seeds = []
+    seeds_by_key = {}
 
     if REF_AUDIO_DIR.is_file():
-        seeds.append({
+        seed = {
             "key": REF_AUDIO_DIR.stem,
             "wav": REF_AUDIO_DIR,
             "text": PROMPT_TEXT_FALLBACK,
-        })
+        }
+        seeds.append(seed)
+        seeds_by_key[seed["key"]] = seed
         print(f"[DEBUG] Seed bank: single file {REF_AUDIO_DIR}")
-        return seeds
+        return seeds, seeds_by_key, pick_baseline_seed(seeds)
 
     if not REF_AUDIO_DIR.is_dir():
         raise SystemExit(f"REF_AUDIO_DIR not found or not a directory: {REF_AUDIO_DIR}")
@@ -639,11 +759,13 @@ def load_seeds():
         transcript = txt.read_text(encoding="utf-8", errors="replace").strip()
         if not transcript:
             raise SystemExit(f"Transcript file is empty: {txt}")
-        seeds.append({
+        seed = {
             "key": wav.stem,
             "wav": wav,
             "text": transcript,
-        })
+        }
+        seeds.append(seed)
+        seeds_by_key[seed["key"]] = seed
 
     if not seeds:
         raise SystemExit(
@@ -651,7 +773,7 @@ def load_seeds():
         )
 
     print(f"[DEBUG] Seed bank: {len(seeds)} seeds loaded from {REF_AUDIO_DIR}")
-    return seeds
+    return seeds, seeds_by_key, pick_baseline_seed(seeds)
 
 
 def pick_baseline_seed(seeds):
@@ -696,9 +818,60 @@ def load_narrator_seed():
 # TLK SOUNDREF CHECK
 # ==============================
 
+# dialog.tlk V1 layout: 18-byte header, then one 26-byte entry per strref
+# (flags u16, sound resref 8s, volume/pitch variance, string offset/length).
+_TLK_HEADER = struct.Struct("<4s4sHII")
+_TLK_ENTRY = struct.Struct("<H8s16x")
+
+
+def load_tlk_soundrefs(dialog_tlk_path: Path) -> dict[int, str | None]:
+    """
+    Read every strref's sound resref straight out of dialog.tlk's entry
+    table in a single pass. Same answer WeiDU --string gives, without one
+    WeiDU process per strref.
+    """
+    with dialog_tlk_path.open("rb") as f:
+        # mmap refuses an empty file, so size-check before mapping.
+        if os.fstat(f.fileno()).st_size < _TLK_HEADER.size:
+            print(f"[WARN] {dialog_tlk_path} is too small to be a TLK; falling back to WeiDU lookups.")
+            return {}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            sig, ver, _langid, num_entries, _data_offset = _TLK_HEADER.unpack_from(mm, 0)
+            if sig != b"TLK " or ver != b"V1  ":
+                print(f"[WARN] Unexpected TLK header {sig!r} {ver!r} in {dialog_tlk_path}; "
+                      f"falling back to WeiDU lookups.")
+                return {}
+
+            table_end = _TLK_HEADER.size + num_entries * _TLK_ENTRY.size
+            if table_end > len(mm):
+                print(f"[WARN] Truncated TLK entry table in {dialog_tlk_path}; falling back to WeiDU lookups.")
+                return {}
+
+            soundrefs: dict[int, str | None] = {}
+            table = memoryview(mm)[_TLK_HEADER.size:table_end]
+            try:
+                for strref, (_flags, resref) in enumerate(_TLK_ENTRY.iter_unpack(table)):
+                    sound = resref.split(b"\0", 1)[0].decode("ascii", "replace").strip()
+                    soundrefs[strref] = sound or None
+            finally:
+                table.release()
+
+    print(f"[DEBUG] Loaded soundrefs for {len(soundrefs)} strref(s) from {dialog_tlk_path.name}")
+    return soundrefs
+
+
+_MISSING = object()
+
+
 def get_soundref_for_strref(strref: int) -> str | None:
-    if strref in _SOUNDREF_CACHE:
-        return _SOUNDREF_CACHE[strref]
+    # _SOUNDREF_CACHE is preloaded from dialog.tlk by run_for_dlg. With the
+    # full table loaded, a strref it lacks is out of range and has no sound,
+    # so WeiDU is only asked when the TLK could not be read directly.
+    sound = _SOUNDREF_CACHE.get(strref, _MISSING)
+    if sound is not _MISSING:
+        return sound
+    if _SOUNDREF_TABLE_LOADED:
+        return None
 
     cmd = [
         str(WEIDU_EXE),
@@ -712,7 +885,7 @@ def get_soundref_for_strref(strref: int) -> str | None:
         text=True
     )
     out = (proc.stdout or "") + (proc.stderr or "")
-    m = re.search(r"~.*?~\s*\[([^\]]+)\]", out, re.DOTALL)
+    m = _WEIDU_STRING_RE.search(out)
     if not m:
         _SOUNDREF_CACHE[strref] = None
         return None
@@ -727,18 +900,100 @@ def get_soundref_for_strref(strref: int) -> str | None:
 # WEIDU: DLG / TRA
 # ==============================
 
+def decompile_cache_key(dlg_basename: str):
+    """
+    Everything a WeiDU decompile of <basename>.DLG depends on: the BIFF
+    index, an override copy of the DLG (if any), and dialog.tlk, whose text
+    --transref writes into the .TRA. None when CHITIN.KEY can't be found.
+
+    The run restores dialog.tlk with copy2, which keeps its mtime, so an
+    unchanged TLK keeps the same stamp from run to run.
+    """
+    chitin = chitin_key_stamp()
+    if chitin is None:
+        return None
+    override_dir = GAME_DIR / "override"
+    return {
+        "chitin": chitin,
+        "override": file_stamp(
+            override_dir / f"{dlg_basename}.DLG",
+            override_dir / f"{dlg_basename.lower()}.dlg",
+        ),
+        "tlk": file_stamp(GAME_DIR / "lang" / WEIDU_LANG / "dialog.tlk"),
+        "lang": WEIDU_LANG,
+    }
+
+
+def restore_decompile_cache(dlg_basename: str, key, d_path: Path, tra_path: Path) -> bool:
+    """
+    Copy a cached .D / .TRA for dlg_basename into place if the cache entry
+    was made from the same inputs; True on a hit. Plain copy2 rather than
+    fast_copy: these are small files, cheaper than a cp process each.
+    """
+    name = dlg_basename.upper()
+    meta_path = DECOMPILE_CACHE_DIR / f"{name}.json"
+    cached_d = DECOMPILE_CACHE_DIR / f"{name}.D"
+    cached_tra = DECOMPILE_CACHE_DIR / f"{name}.TRA"
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    if meta != key or not cached_d.is_file() or not cached_tra.is_file():
+        return False
+    try:
+        shutil.copy2(cached_d, d_path)
+        shutil.copy2(cached_tra, tra_path)
+    except OSError as e:
+        print(f"[WARN] Failed to restore cached decompile of {dlg_basename}.DLG: {e}")
+        return False
+    return True
+
+
+def store_decompile_cache(dlg_basename: str, key, d_path: Path, tra_path: Path):
+    """
+    Save a fresh .D / .TRA for later runs. The key file is written last, so
+    an interrupted store never looks like a valid entry.
+    """
+    name = dlg_basename.upper()
+    meta_path = DECOMPILE_CACHE_DIR / f"{name}.json"
+    try:
+        DECOMPILE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        meta_path.unlink(missing_ok=True)
+        shutil.copy2(d_path, DECOMPILE_CACHE_DIR / f"{name}.D")
+        shutil.copy2(tra_path, DECOMPILE_CACHE_DIR / f"{name}.TRA")
+        meta_path.write_text(json.dumps(key), encoding="utf-8")
+    except OSError as e:
+        print(f"[WARN] Failed to cache decompiled {dlg_basename}.DLG: {e}")
+
+
 def ensure_dlg_decompiled_for(dlg_basename: str):
     """
     Ensure <basename>.D / <basename>.TRA exist.
     Track which basenames we actually decompiled so we can clean them.
+
+    That same set memoizes the call: FORCE_REEXTRACT re-runs WeiDU once per
+    basename per run, not every time the basename is asked for.
+
+    Otherwise a decompile from an earlier run with the same inputs (see
+    decompile_cache_key) is copied back instead of running WeiDU again.
     """
     d_path = GAME_DIR / f"{dlg_basename}.D"
     tra_path = GAME_DIR / f"{dlg_basename}.TRA"
-    need = FORCE_REEXTRACT or not (d_path.is_file() and tra_path.is_file())
+    present = d_path.is_file() and tra_path.is_file()
+    fresh = dlg_basename.upper() in _DECOMPILED_CREATED
+    need = not present or (FORCE_REEXTRACT and not fresh)
     if not need:
         print(f"[DEBUG] .D and .TRA already present for {dlg_basename}, skipping WeiDU DLG decompile.")
         return d_path, tra_path
 
+    cache_key = decompile_cache_key(dlg_basename)
+    if cache_key is not None and not FORCE_REEXTRACT:
+        if restore_decompile_cache(dlg_basename, cache_key, d_path, tra_path):
+            print(f"[DEBUG] Restored {dlg_basename}.D / .TRA from {DECOMPILE_CACHE_DIR}, skipping WeiDU DLG decompile.")
+            with _DECOMPILED_LOCK:
+                _DECOMPILED_CREATED.add(dlg_basename.upper())
+            return d_path, tra_path
+
     if not WEIDU_EXE:
         raise SystemExit("WEIDU_EXE not configured.")
 
@@ -765,10 +1020,35 @@ def ensure_dlg_decompiled_for(dlg_basename: str):
     if not d_path.is_file() or not tra_path.is_file():
         raise SystemExit(f"WeiDU ran but {d_path} or {tra_path} is missing.")
 
-    _DECOMPILED_CREATED.add(dlg_basename.upper())
+    if cache_key is not None:
+        store_decompile_cache(dlg_basename, cache_key, d_path, tra_path)
+
+    with _DECOMPILED_LOCK:
+        _DECOMPILED_CREATED.add(dlg_basename.upper())
     return d_path, tra_path
 
 
+def decompile_all(dlg_basenames: list[str]):
+    """
+    Run ensure_dlg_decompiled_for over all basenames concurrently.
+
+    Each WeiDU run writes its own <basename>.D / .TRA into GAME_DIR, so
+    runs don't collide. Results are yielded in input order as soon as each
+    one is ready, so the caller can parse the first variant while WeiDU is
+    still decompiling the rest.
+    """
+    if not dlg_basenames:
+        return
+    if len(dlg_basenames) == 1:
+        yield ensure_dlg_decompiled_for(dlg_basenames[0])
+        return
+    workers = min(8, os.cpu_count() or 1, len(dlg_basenames))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [ex.submit(ensure_dlg_decompiled_for, b) for b in dlg_basenames]
+        for fut in futures:
+            yield fut.result()
+
+
 def cleanup_decompiled_sources():
     """
     Remove any .D / .TRA files we ourselves decompiled this run.
@@ -782,55 +1062,13 @@ def cleanup_decompiled_sources():
     for basename in sorted(_DECOMPILED_CREATED):
         for ext in (".D", ".TRA"):
             path = GAME_DIR / f"{basename}{ext}"
-            if path.exists():
-                try:
-                    path.unlink()
-                    print(f"[DEBUG] Cleaned decompiled {path.name}")
-                except OSError as e:
-                    print(f"[WARN] Failed to remove {path}: {e}")
-
-
-def find_numbered_dlg_variants(base_name: str):
-    """
-    Return all DLG basenames that appear to be variants of base_name.
-
-    Strategy (robust, not clever):
-      - Normalize base_name to upper case.
-      - Scan GAME_DIR for any files with extension .DLG / .D / .TRA.
-      - If the stem (filename without extension) CONTAINS the base_name
-        substring (case-insensitive), treat that stem as a variant.
-      - Always include the exact base_name itself.
-    """
-    base = base_name.upper()
-    variants = set()
-    variants.add(base)
-
-    debug_candidates = []
-
-    for path in GAME_DIR.iterdir():
-        if not path.is_file():
-            continue
-
-        ext = path.suffix.lower()
-        if ext not in (".dlg", ".d", ".tra"):
-            continue
-
-        stem = path.stem.upper()
-        debug_candidates.append(stem)
-
-        if base in stem:
-            variants.add(stem)
-
-    variants_list = sorted(variants)
-    print(f"[DEBUG] DLG variants detected for base '{base}': {', '.join(variants_list)}")
-
-    # Optional extra debug: uncomment if you want to see all candidate stems we considered
-    # print(f"[DEBUG] DLG candidate stems in GAME_DIR: {', '.join(sorted(set(debug_candidates)))}")
-
-    return variants_list
-
-
-
+            try:
+                path.unlink()
+                print(f"[DEBUG] Cleaned decompiled {path.name}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[WARN] Failed to remove {path}: {e}")
 
 
 # ==============================
@@ -874,62 +1112,64 @@ def ensure_tlk_traified():
 
 
 def parse_tlk_tra(tlk_tra_path: Path):
-    content = load_text(tlk_tra_path)
-    pattern = re.compile(
-        r"@(\d+)\s*=\s*~(.*?)~",
-        re.DOTALL,
-    )
+    """
+    Returns (strref_to_text, strref_to_text_id, strrefs_by_text_id).
+
+    Every distinct text (by normalize_text_for_match) gets a small int id
+    while parsing, so expand_duplicates works with int lookups and never
+    re-hashes a text. The normalized texts are only needed to hand out ids,
+    so they key id_of_key directly (str hashes are computed once and cached
+    on the object) and are dropped when parsing ends.
+    """
     strref_to_text = {}
-    textkey_to_strrefs = {}
+    strref_to_text_id = {}
+    strrefs_by_text_id = []
+    id_of_key = {}
 
-    for m in pattern.finditer(content):
+    for m in iter_file_matches(tlk_tra_path, _TLK_ENTRY_RE):
         strref = int(m.group(1))
-        text = m.group(2)
+        text = decode_weidu_text(m.group(2))
         strref_to_text[strref] = text
-        key = normalize_text_for_match(text)
-        textkey_to_strrefs.setdefault(key, []).append(strref)
+        text_id = id_of_key.setdefault(normalize_text_for_match(text), len(id_of_key))
+        if text_id == len(strrefs_by_text_id):
+            strrefs_by_text_id.append([])
+        strrefs_by_text_id[text_id].append(strref)
+        strref_to_text_id[strref] = text_id
 
     print(f"[DEBUG] parse_tlk_tra: parsed {len(strref_to_text)} TLK entries from dialog_full.tra")
-    return strref_to_text, textkey_to_strrefs
+    return strref_to_text, strref_to_text_id, strrefs_by_text_id
 
 
-def expand_duplicates(voiced_lines, strref_to_text, textkey_to_strrefs):
+def expand_duplicates(voiced_lines, strref_to_text, strref_to_text_id, strrefs_by_text_id):
     if not voiced_lines:
         return voiced_lines
 
-    by_strref = {line["strref"]: line for line in voiced_lines}
-    extra = []
-
-    for line in list(voiced_lines):
-        base_strref = line["strref"]
-        base_text = strref_to_text.get(base_strref)
-        if not base_text:
-            continue
+    by_strref = {line.strref: line for line in voiced_lines}
 
-        key = normalize_text_for_match(base_text)
-        dup_refs = textkey_to_strrefs.get(key, [])
-        if not dup_refs:
+    # First voiced line per TLK text. Later lines with the same text would
+    # only rediscover the same duplicate strrefs, so each text is expanded once.
+    first_by_id = {}
+    for line in voiced_lines:
+        if not strref_to_text.get(line.strref):
             continue
+        first_by_id.setdefault(strref_to_text_id[line.strref], line)
 
-        for sr in dup_refs:
+    extra = []
+    for text_id, line in first_by_id.items():
+        for sr in strrefs_by_text_id[text_id]:
             if sr in by_strref:
                 continue
 
             soundref = get_soundref_for_strref(sr)
             if soundref:
-                print(f"[DEBUG] Duplicate strref {sr} already has sound [{soundref}], skipping duplicate-VO")
+                _dbg(f"Duplicate strref {sr} already has sound [{soundref}], skipping duplicate-VO")
                 continue
 
-            dup_text = strref_to_text.get(sr, line["text"])
-            clone = {
-                "tra_id": None,
-                "strref": sr,
-                "text": dup_text,
-                "tts_text": line["tts_text"],
-                "resref": line["resref"],
-            }
+            dup_text = strref_to_text.get(sr, line.text)
+            clone = dataclasses.replace(line, tra_id=None, strref=sr, text=dup_text)
             extra.append(clone)
             by_strref[sr] = clone
+    flush_dbg()
 
     if extra:
         print(f"[DEBUG] Global TLK dedup: added {len(extra)} duplicate strref(s) via text match.")
@@ -940,83 +1180,25 @@ def expand_duplicates(voiced_lines, strref_to_text, textkey_to_strrefs):
 # PARSE .D / .TRA INTO LINES
 # ==============================
 
-def find_dlg_variants_from_d_source(base_name: str, main_d_path: Path):
-    """
-    Inspect the decompiled .D source for the base dialog and infer any
-    sibling DLG names that look like variants with letter/number suffixes.
-
-    Example:
-      base_name = "DILQUIX"
-      main_d_path contains tokens DILQUIX, DILQUIXN, DILQUIXT
-      -> we return ["DILQUIX", "DILQUIXN", "DILQUIXT"]
-
-    Strategy:
-      - Tokenize all ALL-CAPS identifiers in the .D file.
-      - Keep tokens that start with the base_name in upper-case.
-      - Accept short (1–3 char) [A–Z0–9] suffixes as “variant” names.
-    """
-    base = base_name.upper()
-    text = load_text(main_d_path)
-    upper = text.upper()
-
-    variants = set()
-    variants.add(base)
-
-    # All-caps-ish tokens from the .D script
-    for m in re.finditer(r"\b([A-Z][A-Z0-9_]*)\b", upper):
-        token = m.group(1)
-        if not token.startswith(base):
-            continue
-        if token == base:
-            continue
-
-        suffix = token[len(base):]
-        # We only consider short, simple suffixes like "N", "T", "2", "A1", etc.
-        if not suffix:
-            continue
-        if not (1 <= len(suffix) <= 3):
-            continue
-        if not re.fullmatch(r"[A-Z0-9]+", suffix):
-            continue
-
-        variants.add(token)
-
-    variants_list = sorted(variants)
-    print(f"[DEBUG] DLG variants detected from {main_d_path.name}: {', '.join(variants_list)}")
-    return variants_list
-
-
 def parse_dlg_d(d_path: Path):
-    content = load_text(d_path)
-    pattern = re.compile(r"\bSAY\s+@(\d+)", re.IGNORECASE)
-    say_ids = {int(m.group(1)) for m in pattern.finditer(content)}
+    say_ids = {int(m.group(1)) for m in iter_file_matches(d_path, _SAY_RE)}
     print(f"[DEBUG] parse_dlg_d: found {len(say_ids)} SAY @N references in {d_path.name}")
     return say_ids
 
 
 def parse_tra(tra_path: Path):
-    content = load_text(tra_path)
-    pattern = re.compile(
-        r"@(\d+)\s*=\s*#(\d+)\s*/\*\s*~(.*?)~.*?\*/",
-        re.DOTALL,
-    )
     tra_map = {}
-    for m in pattern.finditer(content):
+    for m in iter_file_matches(tra_path, _TRA_ENTRY_RE):
         tra_id = int(m.group(1))
         strref = int(m.group(2))
-        text = m.group(3)
+        text = decode_weidu_text(m.group(3))
         tra_map[tra_id] = {"tra_id": tra_id, "text": text, "strref": strref}
     print(f"[DEBUG] parse_tra: parsed {len(tra_map)} @N entries from {tra_path.name}")
     return tra_map
 
 
 def build_resref(strref: int) -> str:
-    base = VOICE_PREFIX.upper()
-    if len(base) < 2:
-        base = (base + "XX")[:2]
-    else:
-        base = base[:2]
-    return f"{base}{strref:06d}"
+    return f"{RESREF_PREFIX}{strref:06d}"
 
 
 def build_lines(d_path: Path, tra_path: Path):
@@ -1040,14 +1222,14 @@ def build_lines(d_path: Path, tra_path: Path):
             if RESPECT_EXISTING_VO:
                 skipped_original_vo += 1
                 if skipped_original_vo <= 10:
-                    print(
-                        f"[DEBUG] Skipping strref {strref} in {d_path.name}: "
+                    _dbg(
+                        f"Skipping strref {strref} in {d_path.name}: "
                         f"existing soundref [{baseline_sound}]"
                     )
                 continue
             else:
-                print(
-                    f"[DEBUG] Overriding existing VO for strref {strref} in {d_path.name}: "
+                _dbg(
+                    f"Overriding existing VO for strref {strref} in {d_path.name}: "
                     f"existing soundref [{baseline_sound}]"
                 )
 
@@ -1056,19 +1238,20 @@ def build_lines(d_path: Path, tra_path: Path):
         # Skip obvious junk/sentinel nodes
         norm = normalize_text_for_match(tts_text).upper()
         if norm == "NULL NODE":
-            print(f"[DEBUG] Skipping sentinel TLK text for strref {strref}: {tts_text!r}")
+            _dbg(f"Skipping sentinel TLK text for strref {strref}: {tts_text!r}")
             continue
         resref = build_resref(strref)
 
         lines.append(
-            {
-                "tra_id": tra_id,
-                "strref": strref,
-                "text": text,
-                "tts_text": tts_text,
-                "resref": resref,
-            }
+            VoicedLine(
+                tra_id=tra_id,
+                strref=strref,
+                text=text,
+                tts_text=tts_text,
+                resref=resref,
+            )
         )
+    flush_dbg()
 
     print(f"[DEBUG] build_lines: {len(lines)} lines with SAY @N + strref from {d_path.name}")
     if missing_tra:
@@ -1083,7 +1266,7 @@ def build_lines(d_path: Path, tra_path: Path):
 # ==============================
 
 def describe_line(line):
-    return f"[strref {line['strref']}] {line['text']}"
+    return f"[strref {line.strref}] {line.text}"
 
 
 def plan_generation(lines, seeds):
@@ -1100,7 +1283,7 @@ def plan_generation(lines, seeds):
     asked_global_choice = False
 
     for line in lines:
-        wav_path = SOUNDS_DIR / f"{line['resref']}.wav"
+        wav_path = SOUNDS_DIR / f"{line.resref}.wav"
         if wav_path.is_file():
             if not ASK_ON_EXISTING:
                 keep_lines.append(line)
@@ -1139,6 +1322,13 @@ def targeted_regen_by_word(lines, keep_lines, regen_lines):
     if not lines:
         return
 
+    # Identity sets: `line in list` would compare VoicedLines field by field
+    # against every entry of the list.
+    regen_ids = {id(line) for line in regen_lines}
+    # Each query is one needle, so the scan is already a single C-level
+    # substring search per line; only the lowercasing is worth hoisting.
+    lowered = [(line, line.text.lower()) for line in lines]
+
     while True:
         s = input(
             "\nRegenerate all lines whose text contains a word/substring? "
@@ -1149,22 +1339,25 @@ def targeted_regen_by_word(lines, keep_lines, regen_lines):
 
         needle = s.lower()
         matched = []
-        for line in lines:
-            if needle in line["text"].lower():
-                if line not in regen_lines:
+        for line, text_lower in lowered:
+            if needle in text_lower:
+                if id(line) not in regen_ids:
                     regen_lines.append(line)
-                if line in keep_lines:
-                    keep_lines.remove(line)
+                    regen_ids.add(id(line))
                 matched.append(line)
+        if matched:
+            # Rebuilt in place rather than swap-popped, so keep order survives
+            matched_ids = {id(line) for line in matched}
+            keep_lines[:] = [line for line in keep_lines if id(line) not in matched_ids]
 
         print(f"[DEBUG] Marked {len(matched)} line(s) for regeneration containing '{s}'.")
         if matched:
             print("[DEBUG] Matched strrefs:")
             for line in matched:
-                snippet = normalize_text_for_match(line["text"])
+                snippet = normalize_text_for_match(line.text)
                 if len(snippet) > 80:
                     snippet = snippet[:77] + "..."
-                print(f"  - {line['strref']}: {snippet}")
+                print(f"  - {line.strref}: {snippet}")
 
             cfg_override = None
             steps_override = None
@@ -1192,9 +1385,9 @@ def targeted_regen_by_word(lines, keep_lines, regen_lines):
             if cfg_override is not None or steps_override is not None:
                 for line in matched:
                     if cfg_override is not None:
-                        line["cfg_override"] = cfg_override
+                        line.cfg_override = cfg_override
                     if steps_override is not None:
-                        line["steps_override"] = steps_override
+                        line.steps_override = steps_override
                 print("[DEBUG] Applied per-line CFG/steps overrides to matched lines.")
 
         while True:
@@ -1213,6 +1406,92 @@ def targeted_regen_by_word(lines, keep_lines, regen_lines):
 # VOXCPM BATCH / SINGLE
 # ==============================
 
+_VOX_MODEL = None
+_VOX_MODEL_FAILED = False
+_VOX_MODEL_LOCK = threading.Lock()
+
+
+def get_voxcpm_model():
+    """
+    Return the shared in-process VoxCPM model, loading it on first use.
+    None means "use the VOXCMD CLI" (disabled, voxcpm not importable, or
+    the model could not be loaded).
+    """
+    global _VOX_MODEL, _VOX_MODEL_FAILED
+    if not VOX_IN_PROCESS or _VOX_MODEL_FAILED:
+        return None
+    with _VOX_MODEL_LOCK:
+        if _VOX_MODEL is None and not _VOX_MODEL_FAILED:
+            try:
+                from voxcpm import VoxCPM
+                import soundfile  # noqa: F401  (used by run_voxcpm)
+            except ImportError as e:
+                print(f"[WARN] voxcpm not importable ({e}); calling {VOXCMD} once per batch instead.")
+                _VOX_MODEL_FAILED = True
+                return None
+            model_name = VOX_MODEL_ID or "(voxcpm default)"
+            model_args = () if VOX_MODEL_ID is None else (VOX_MODEL_ID,)
+            print(f"[DEBUG] Loading VoxCPM model {model_name} in-process (once per run).")
+            try:
+                try:
+                    _VOX_MODEL = VoxCPM.from_pretrained(
+                        *model_args, load_denoiser=USE_DENOISE, optimize=VOX_OPTIMIZE
+                    )
+                except TypeError:
+                    # Older voxcpm releases have no optimize switch.
+                    _VOX_MODEL = VoxCPM.from_pretrained(*model_args, load_denoiser=USE_DENOISE)
+            except Exception as e:
+                # Download, CUDA or out-of-memory failures: the CLI may still
+                # manage (own process, fresh GPU state), so don't abort here.
+                print(f"[WARN] Loading {model_name} in-process failed ({e}); "
+                      f"calling {VOXCMD} once per batch instead.")
+                _VOX_MODEL = None
+                _VOX_MODEL_FAILED = True
+                return None
+        return _VOX_MODEL
+
+
+def voxcmd_base() -> list[str]:
+    """VOXCMD plus the model selection every CLI call shares."""
+    if VOX_MODEL_ID is None:
+        return [VOXCMD]
+    return [VOXCMD, "--hf-model-id", VOX_MODEL_ID]
+
+
+def numbered_wavs(out_dir: Path, count: int) -> list[Path]:
+    """Output paths for an in-process batch; name order == input order."""
+    return [out_dir / f"{i:05d}.wav" for i in range(count)]
+
+
+def run_voxcpm(cmd, texts, out_paths, prompt_audio, prompt_text, cfg_value, steps_value):
+    """
+    Synthesize texts[i] into out_paths[i] with the in-process model, or run
+    the equivalent VOXCMD command line when no model is available.
+    """
+    model = get_voxcpm_model()
+    if model is None:
+        print(f"[DEBUG] VoxCPM: {' '.join(cmd)}")
+        subprocess.run(cmd, check=True)
+        return
+
+    import soundfile
+
+    print(f"[DEBUG] VoxCPM in-process: {len(texts)} line(s), cfg={cfg_value:.3f}, steps={steps_value}")
+    sample_rate = model.tts_model.sample_rate
+    # One model, one GPU: concurrent chunks (VOX_PARALLEL > 1) take turns.
+    with _VOX_MODEL_LOCK:
+        for text, out_path in zip(texts, out_paths):
+            wav = model.generate(
+                text=text,
+                prompt_wav_path=str(prompt_audio),
+                prompt_text=prompt_text,
+                cfg_value=cfg_value,
+                inference_timesteps=steps_value,
+                normalize=USE_NORMALIZE,
+                denoise=USE_DENOISE,
+            )
+            soundfile.write(str(out_path), wav, sample_rate)
+
 def build_chunks_for_regen(regen_lines, seeds):
     if not regen_lines:
         return {}
@@ -1221,116 +1500,181 @@ def build_chunks_for_regen(regen_lines, seeds):
     if not keys:
         raise SystemExit("No seeds loaded.")
 
+    group_size = SEED_GROUP_SIZE
+    seed_count = len(keys)
+    default_steps = INFERENCE_STEPS
+
     chunks = {}
+    group_cfgs = {}
     for idx, line in enumerate(regen_lines):
-        group_index = idx // SEED_GROUP_SIZE
-        seed_key = keys[group_index % len(keys)]
-        line["seed_key"] = seed_key
+        group_index = idx // group_size
+        seed_key = keys[group_index % seed_count]
+        line.seed_key = seed_key
 
-        cfg_value = line.get("cfg_override")
+        cfg_value = line.cfg_override
         if cfg_value is None:
-            cfg_value = random.uniform(CFG_MIN, CFG_MAX)
+            # One random CFG per seed group (not per line), so the whole group
+            # lands in a single chunk and is synthesized by one VoxCPM call.
+            if group_index not in group_cfgs:
+                group_cfgs[group_index] = random.uniform(CFG_MIN, CFG_MAX)
+            cfg_value = group_cfgs[group_index]
 
-        steps_value = line.get("steps_override")
+        steps_value = line.steps_override
         if steps_value is None:
-            steps_value = INFERENCE_STEPS
+            steps_value = default_steps
 
-        chunk_key = (seed_key, cfg_value, steps_value)
-        if chunk_key not in chunks:
-            chunks[chunk_key] = []
-        chunks[chunk_key].append(line)
+        chunks.setdefault((seed_key, cfg_value, steps_value), []).append(line)
 
     return chunks
 
 
-def run_voxcpm_batch(chunks, seeds_by_key):
-    TMP_OUT_DIR.mkdir(parents=True, exist_ok=True)
+def purge_wavs(dir_path: Path):
+    """
+    Delete every *.wav directly inside dir_path (leftovers from a previous
+    VoxCPM batch), without building a Path per entry.
+    """
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            if entry.name.endswith(".wav"):
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
 
-    for (seed_key, cfg_value, steps_value), chunk in chunks.items():
-        for old in TMP_OUT_DIR.glob("*.wav"):
-            try:
-                old.unlink()
-            except FileNotFoundError:
-                pass
 
-        print(f"[DEBUG] Running VoxCPM batch for seed '{seed_key}' with cfg={cfg_value:.3f}, "
-              f"steps={steps_value} on {len(chunk)} line(s).")
-
-        seed = seeds_by_key.get(seed_key)
-        if not seed:
-            raise SystemExit(f"No seed data found for key '{seed_key}'")
-
-        prompt_audio = seed["wav"]
-        prompt_text = seed["text"]
-
-        lines_text = [line["tts_text"] for line in chunk]
-        text = "\n".join(lines_text)
-        save_text(INPUT_TXT, text, encoding="utf-8")
-
-        cmd = [
-            VOXCMD,
-            "--input", str(INPUT_TXT),
-            "--output-dir", str(TMP_OUT_DIR),
-            "--prompt-audio", str(prompt_audio),
-            "--prompt-text", prompt_text,
-            "--cfg-value", f"{cfg_value:.3f}",
-            "--inference-timesteps", str(steps_value),
-        ]
-        if USE_NORMALIZE:
-            cmd.append("--normalize")
-        if USE_DENOISE:
-            cmd.append("--denoise")
+def has_wavs(dir_path: Path) -> bool:
+    """
+    True if dir_path exists and holds at least one *.wav; stops at the first.
+    """
+    try:
+        with os.scandir(dir_path) as it:
+            return any(entry.name.endswith(".wav") for entry in it)
+    except FileNotFoundError:
+        return False
 
-        print(f"[DEBUG] VoxCPM: {' '.join(cmd)}")
-        append_log(f"[VOXCPM] chunk seed={seed_key}, cfg={cfg_value:.3f}, "
-                   f"steps={steps_value}, lines={len(chunk)}")
 
-        subprocess.run(cmd, check=True)
+def list_wavs(dir_path: Path) -> list[Path]:
+    """
+    VoxCPM's output *.wav files in dir_path, in name order (the order the
+    batch input lines were synthesized in).
+    """
+    with os.scandir(dir_path) as it:
+        names = sorted(entry.name for entry in it if entry.name.endswith(".wav"))
+    return [dir_path / name for name in names]
 
-        wavs = sorted(TMP_OUT_DIR.glob("*.wav"))
-        if len(wavs) != len(chunk):
-            raise SystemExit(
-                f"VoxCPM batch output mismatch for seed '{seed_key}' "
-                f"(cfg={cfg_value:.3f}, steps={steps_value}): "
-                f"expected {len(chunk)} wavs, got {len(wavs)}"
-            )
 
-        for src, line in zip(wavs, chunk):
-            target = SOUNDS_DIR / f"{line['resref']}.wav"
-            target.parent.mkdir(parents=True, exist_ok=True)
-            src.replace(target)
-            apply_fade_in_out(target)
-            append_log(f"[GEN] {target.name} <- seed={seed_key}, cfg={cfg_value:.3f}, "
-                       f"steps={steps_value}, strref={line['strref']}")
-        print(f"[DEBUG]     Wrote {len(chunk)} wav(s) into {SOUNDS_DIR} for seed '{seed_key}'")
+def run_voxcpm_chunk(index: int, key, chunk, seeds_by_key):
+    """
+    Synthesize one (seed_key, cfg, steps) chunk into SOUNDS_DIR. Each chunk
+    gets its own input file and output dir under TMP_OUT_DIR, so several can
+    run side by side.
+    """
+    seed_key, cfg_value, steps_value = key
+    chunk_dir = TMP_OUT_DIR / f"chunk_{index:03d}"
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+    purge_wavs(chunk_dir)
 
+    print(f"[DEBUG] Running VoxCPM batch for seed '{seed_key}' with cfg={cfg_value:.3f}, "
+          f"steps={steps_value} on {len(chunk)} line(s).")
 
-def run_voxcpm_single(text: str, seed: dict, out_path: Path, cfg_value: float | None = None):
-    if cfg_value is None:
-        cfg_value = BASELINE_CFG
-
-    TMP_OUT_DIR.mkdir(parents=True, exist_ok=True)
+    seed = seeds_by_key.get(seed_key)
+    if not seed:
+        raise SystemExit(f"No seed data found for key '{seed_key}'")
 
     prompt_audio = seed["wav"]
     prompt_text = seed["text"]
 
+    # Length-sorted batch: similar-length lines sit next to each other in
+    # the VoxCPM input file. Output wavs are zipped back in this same order.
+    chunk = sorted(chunk, key=lambda line: len(line.tts_text))
+    # Lines with identical TTS text in the same chunk would come out of the
+    # same seed/CFG/steps anyway, so each distinct text is synthesized once.
+    by_text = {}
+    for line in chunk:
+        by_text.setdefault(line.tts_text, []).append(line)
+    lines_text = list(by_text)
+    if len(lines_text) < len(chunk):
+        print(f"[DEBUG] {len(chunk) - len(lines_text)} line(s) share TTS text with another line "
+              f"in this chunk; synthesizing {len(lines_text)} unique text(s).")
+    text = "\n".join(lines_text)
+    input_txt = chunk_dir / INPUT_TXT.name
+    save_text(input_txt, text, encoding="utf-8")
+
     cmd = [
-        VOXCMD,
-        "--text", text,
-        "--output", str(out_path),
+        *voxcmd_base(),
+        "--input", str(input_txt),
+        "--output-dir", str(chunk_dir),
         "--prompt-audio", str(prompt_audio),
         "--prompt-text", prompt_text,
         "--cfg-value", f"{cfg_value:.3f}",
-        "--inference-timesteps", str(INFERENCE_STEPS),
+        "--inference-timesteps", str(steps_value),
     ]
     if USE_NORMALIZE:
         cmd.append("--normalize")
     if USE_DENOISE:
         cmd.append("--denoise")
 
-    print(f"[DEBUG] VoxCPM single: {' '.join(cmd)}")
-    append_log(f"[VOXCPM_SINGLE] {out_path.name} <- seed={prompt_audio}, cfg={cfg_value:.3f}")
-    subprocess.run(cmd, check=True)
+    append_log(f"[VOXCPM] chunk seed={seed_key}, cfg={cfg_value:.3f}, "
+               f"steps={steps_value}, lines={len(chunk)}")
+
+    run_voxcpm(cmd, lines_text, numbered_wavs(chunk_dir, len(lines_text)),
+               prompt_audio, prompt_text, cfg_value, steps_value)
+
+    wavs = list_wavs(chunk_dir)
+    if len(wavs) != len(lines_text):
+        raise SystemExit(
+            f"VoxCPM batch output mismatch for seed '{seed_key}' "
+            f"(cfg={cfg_value:.3f}, steps={steps_value}): "
+            f"expected {len(lines_text)} wavs, got {len(wavs)}"
+        )
+
+    # Chunks never share a resref, so concurrent chunks write disjoint targets.
+    SOUNDS_DIR.mkdir(parents=True, exist_ok=True)
+    targets = []
+    copies = []
+    log_lines = []
+    for src, same_text in zip(wavs, by_text.values()):
+        first = SOUNDS_DIR / f"{same_text[0].resref}.wav"
+        os.replace(src, first)
+        targets.append(first)
+        for line in same_text:
+            target = SOUNDS_DIR / f"{line.resref}.wav"
+            if target != first:
+                copies.append((first, target))
+            log_lines.append(f"[GEN] {target.name} <- seed={seed_key}, cfg={cfg_value:.3f}, "
+                             f"steps={steps_value}, strref={line.strref}")
+    append_log("\n".join(log_lines))
+    batch_apply_fades(targets)
+    # Copied (not linked) after fading: a later in-place fade or regen of one
+    # resref must not touch the others. Plain copy2: these are a few KB each,
+    # far cheaper than a cp process per file.
+    for first, target in copies:
+        shutil.copy2(first, target)
+    shutil.rmtree(chunk_dir, ignore_errors=True)
+    print(f"[DEBUG]     Wrote {len(chunk)} wav(s) into {SOUNDS_DIR} for seed '{seed_key}'")
+
+
+def run_voxcpm_batch(chunks, seeds_by_key):
+    TMP_OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    jobs = list(enumerate(chunks.items()))
+    workers = max(1, min(VOX_PARALLEL, len(jobs)))
+    if workers == 1:
+        for index, (key, chunk) in jobs:
+            run_voxcpm_chunk(index, key, chunk, seeds_by_key)
+        return
+
+    # Synthesis time grows with text length, so start the longest chunks
+    # first; short ones then fill the gaps instead of one long chunk
+    # running alone at the end.
+    jobs.sort(key=lambda job: sum(len(line.tts_text) for line in job[1][1]), reverse=True)
+
+    print(f"[DEBUG] Running {len(jobs)} VoxCPM chunk(s), {workers} at a time.")
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [ex.submit(run_voxcpm_chunk, index, key, chunk, seeds_by_key)
+                   for index, (key, chunk) in jobs]
+        for fut in futures:
+            fut.result()
 
 
 def synthesize_baseline(lines, baseline_seed, seeds_by_key):
@@ -1352,33 +1696,38 @@ def synthesize_lines_batch(regen_lines, seeds, seeds_by_key):
 # NARRATION SPLIT / CLASSIFY
 # ==============================
 
+@functools.lru_cache(maxsize=4096)
 def split_narrator_and_dialog(full_text: str):
     """
     Split a TLK line into segments tagged as "character" or "narrator"
-    using quote state.
-    """
-    segments = []
-    current = []
-    in_quote = False
-
-    for ch in full_text:
-        if ch == '"':
-            seg_text = "".join(current)
-            if seg_text.strip():
-                role = "character" if in_quote else "narrator"
-                segments.append((role, seg_text))
-            current = []
-            in_quote = not in_quote
-        else:
-            current.append(ch)
+    using quote state. Blank segments are dropped.
 
-    if current:
-        seg_text = "".join(current)
-        if seg_text.strip():
-            role = "character" if in_quote else "narrator"
-            segments.append((role, seg_text))
+    Cached (hence a tuple): classify_narrator_only_lines and
+    prepare_narration_tasks both split the same regen lines.
+    """
+    # Pieces between quotes alternate narrator/character, starting outside
+    # a quote; an unclosed final quote still counts as character text.
+    return tuple(
+        ("character" if i % 2 else "narrator", seg_text)
+        for i, seg_text in enumerate(full_text.split('"'))
+        if seg_text.strip()
+    )
 
-    return segments
+
+@functools.lru_cache(maxsize=4096)
+def narration_roles(full_text: str):
+    """
+    (has_narrator, has_character) for a TLK line, read straight off the
+    cached split so repeated texts are classified once.
+    """
+    if '"' not in full_text:
+        # No quotes: the whole line is one narrator piece (or blank), and
+        # nothing downstream needs its split.
+        return bool(full_text.strip()), False
+    segments = split_narrator_and_dialog(full_text)
+    has_narr = any(role == "narrator" for role, _seg in segments)
+    has_char = any(role == "character" for role, _seg in segments)
+    return has_narr, has_char
 
 
 def classify_narrator_only_lines(regen_lines):
@@ -1393,22 +1742,13 @@ def classify_narrator_only_lines(regen_lines):
     mixed = []
 
     for line in regen_lines:
-        segments = split_narrator_and_dialog(line["text"])
-        if not segments:
-            # No quotes detected; treat as character-only by default.
-            char_only.append(line)
-            continue
-
-        has_narr = any(role == "narrator" and seg.strip() for role, seg in segments)
-        has_char = any(role == "character" and seg.strip() for role, seg in segments)
-
-        if has_narr and not has_char:
-            narr_only.append(line)
-        elif has_char and not has_narr:
-            char_only.append(line)
-        elif has_narr and has_char:
+        has_narr, has_char = narration_roles(line.text)
+        if has_narr and has_char:
             mixed.append(line)
+        elif has_narr:
+            narr_only.append(line)
         else:
+            # Character-only, or nothing but blank segments.
             char_only.append(line)
 
     print(
@@ -1419,32 +1759,95 @@ def classify_narrator_only_lines(regen_lines):
     return narr_only, char_only, mixed
 
 
+_RIFF_HEADER = struct.Struct("<4sI4s")
+_RIFF_CHUNK = struct.Struct("<4sI")
+_WAV_FMT = struct.Struct("<HHIIHH")
+_WAV_PCM_TAGS = (0x0001, 0xFFFE)  # WAVE_FORMAT_PCM, WAVE_FORMAT_EXTENSIBLE
+_COPY_BLOCK = 1 << 20
+
+
+def read_wav_layout(f, wav_path: Path):
+    """
+    Walk the RIFF chunks of an open PCM .wav and leave f positioned at the
+    start of the sample data.
+
+    Returns ((nchannels, sampwidth, framerate), data_bytes), where
+    data_bytes is trimmed to whole frames exactly like wave.readframes.
+    """
+    hdr = f.read(_RIFF_HEADER.size)
+    if len(hdr) < _RIFF_HEADER.size:
+        raise SystemExit(f"Truncated WAV header: {wav_path}")
+    riff, _, wave_id = _RIFF_HEADER.unpack(hdr)
+    if riff != b"RIFF" or wave_id != b"WAVE":
+        raise SystemExit(f"Not a RIFF/WAVE file: {wav_path}")
+
+    fmt = None
+    while True:
+        chunk = f.read(_RIFF_CHUNK.size)
+        if len(chunk) < _RIFF_CHUNK.size:
+            raise SystemExit(f"No data chunk in WAV: {wav_path}")
+        chunk_id, size = _RIFF_CHUNK.unpack(chunk)
+        if chunk_id == b"fmt ":
+            body = f.read(size + (size & 1))
+            if size < _WAV_FMT.size or len(body) < _WAV_FMT.size:
+                raise SystemExit(f"Bad fmt chunk in WAV: {wav_path}")
+            tag, nchannels, framerate, _, block_align, bits = _WAV_FMT.unpack_from(body)
+            if tag not in _WAV_PCM_TAGS or not nchannels or not bits:
+                raise SystemExit(f"Unsupported WAV encoding (format tag {tag:#x}): {wav_path}")
+            fmt = (nchannels, (bits + 7) // 8, framerate)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise SystemExit(f"WAV data chunk before fmt chunk: {wav_path}")
+            frame_bytes = fmt[0] * fmt[1]
+            return fmt, size // frame_bytes * frame_bytes
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
 def concat_wavs(wav_paths, out_path: Path):
+    """
+    Stitch same-format PCM wavs into out_path by copying the data chunks
+    straight across; only the RIFF headers are parsed, never the samples.
+    """
     if not wav_paths:
         return
 
-    with wave.open(str(wav_paths[0]), "rb") as w0:
-        params0 = w0.getparams()
-        base_fmt = (params0.nchannels, params0.sampwidth, params0.framerate,
-                    params0.comptype, params0.compname)
-        frames = [w0.readframes(w0.getnframes())]
-
-    for p in wav_paths[1:]:
-        with wave.open(str(p), "rb") as w:
-            params = w.getparams()
-            fmt = (params.nchannels, params.sampwidth, params.framerate,
-                   params.comptype, params.compname)
-            if fmt != base_fmt:
-                raise SystemExit(
-                    f"WAV format mismatch when stitching narration for {out_path} "
-                    f"(got {fmt}, expected {base_fmt})"
-                )
-            frames.append(w.readframes(w.getnframes()))
-
-    with wave.open(str(out_path), "wb") as out:
-        out.setparams(params0)
-        for fr in frames:
-            out.writeframes(fr)
+    base_fmt = None
+    total = 0
+    # Built next to the target and swapped in, so a format error part-way
+    # through never leaves a truncated clip behind.
+    part_path = out_path.with_name(out_path.name + ".part")
+    try:
+        with open(part_path, "wb") as out:
+            out.write(bytes(44))  # canonical PCM header, filled in below
+            for p in wav_paths:
+                with open(p, "rb") as src:
+                    fmt, remaining = read_wav_layout(src, p)
+                    if base_fmt is None:
+                        base_fmt = fmt
+                    elif fmt != base_fmt:
+                        raise SystemExit(
+                            f"WAV format mismatch when stitching narration for {out_path} "
+                            f"(got {fmt}, expected {base_fmt})"
+                        )
+                    while remaining > 0:
+                        buf = src.read(min(_COPY_BLOCK, remaining))
+                        if not buf:
+                            break
+                        out.write(buf)
+                        remaining -= len(buf)
+                        total += len(buf)
+
+            nchannels, sampwidth, framerate = base_fmt
+            out.seek(0)
+            out.write(_RIFF_HEADER.pack(b"RIFF", 36 + total, b"WAVE"))
+            out.write(_RIFF_CHUNK.pack(b"fmt ", _WAV_FMT.size))
+            out.write(_WAV_FMT.pack(1, nchannels, framerate, framerate * nchannels * sampwidth,
+                                    nchannels * sampwidth, sampwidth * 8))
+            out.write(_RIFF_CHUNK.pack(b"data", total))
+        os.replace(part_path, out_path)
+    finally:
+        part_path.unlink(missing_ok=True)
 
     apply_fade_in_out(out_path)
 
@@ -1452,22 +1855,19 @@ def concat_wavs(wav_paths, out_path: Path):
 def prepare_narration_tasks(lines_to_rebuild):
     tasks = []
     for line in lines_to_rebuild:
-        text = line["text"]
-        segments = split_narrator_and_dialog(text)
-        if not segments:
-            continue
-
-        has_narr = any(role == "narrator" and seg.strip() for role, seg in segments)
-        has_char = any(role == "character" and seg.strip() for role, seg in segments)
+        text = line.text
+        # Already answered (and cached) by classify_narrator_only_lines.
+        has_narr, has_char = narration_roles(text)
         if not (has_narr and has_char):
             continue
+        segments = split_narrator_and_dialog(text)
 
         seg_order = 0
         for role, seg_text in segments:
             cleaned = clean_segment_for_tts(seg_text)
             if not cleaned:
                 continue
-            tmp_name = f"stitch_{line['strref']}_{seg_order:02d}_{role[0]}.wav"
+            tmp_name = f"stitch_{line.strref}_{seg_order:02d}_{role[0]}.wav"
             tasks.append({
                 "role": role,
                 "line": line,
@@ -1488,11 +1888,7 @@ def run_voxcpm_segments_batch(tasks, seed: dict, role_label: str):
     role_dir = TMP_OUT_DIR / role_label
     role_dir.mkdir(parents=True, exist_ok=True)
 
-    for old in role_dir.glob("*.wav"):
-        try:
-            old.unlink()
-        except FileNotFoundError:
-            pass
+    purge_wavs(role_dir)
 
     texts = [t["text"] for t in tasks]
     text = "\n".join(texts)
@@ -1505,7 +1901,7 @@ def run_voxcpm_segments_batch(tasks, seed: dict, role_label: str):
     prompt_text = seed["text"]
 
     cmd = [
-        VOXCMD,
+        *voxcmd_base(),
         "--input", str(INPUT_TXT),
         "--output-dir", str(role_dir),
         "--prompt-audio", str(prompt_audio),
@@ -1518,12 +1914,13 @@ def run_voxcpm_segments_batch(tasks, seed: dict, role_label: str):
     if USE_DENOISE:
         cmd.append("--denoise")
 
-    print(f"[DEBUG] VoxCPM segments batch ({role_label}): {' '.join(cmd)}")
+    print(f"[DEBUG] VoxCPM segments batch ({role_label}): {len(tasks)} segment(s)")
     append_log(f"[VOXCPM_STITCH_{role_label.upper()}] segments={len(tasks)}, "
                f"cfg={cfg_value:.3f}, steps={steps_value}")
-    subprocess.run(cmd, check=True)
+    run_voxcpm(cmd, texts, numbered_wavs(role_dir, len(texts)),
+               prompt_audio, prompt_text, cfg_value, steps_value)
 
-    wavs = sorted(role_dir.glob("*.wav"))
+    wavs = list_wavs(role_dir)
     if len(wavs) != len(tasks):
         raise SystemExit(
             f"VoxCPM segments batch mismatch for role '{role_label}': "
@@ -1536,114 +1933,94 @@ def run_voxcpm_segments_batch(tasks, seed: dict, role_label: str):
         task["wav_path"] = tmp_path
 
 
-def synthesize_narrator_only_lines(narr_lines, narrator_seed):
+def prepare_narrator_only_tasks(narr_lines):
     """
-    Generate pure narrator-only lines (no quoted speech) entirely
-    with the narrator voice.
+    One narrator-voice task per pure narrator-only line (no quoted speech);
+    its wav becomes the line's final clip rather than a stitch segment.
     """
-    if not narr_lines or narrator_seed is None:
-        return
-
-    nar_dir = TMP_OUT_DIR / "narrator_only"
-    nar_dir.mkdir(parents=True, exist_ok=True)
-
-    for old in nar_dir.glob("*.wav"):
-        try:
-            old.unlink()
-        except FileNotFoundError:
-            pass
-
-    pairs = []
-    texts = []
+    tasks = []
     for line in narr_lines:
-        cleaned = clean_segment_for_tts(line["text"])
+        cleaned = clean_segment_for_tts(line.text)
         if not cleaned:
             continue
-        pairs.append(line)
-        texts.append(cleaned)
-
-    if not texts:
-        return
-
-    text_blob = "\n".join(texts)
-    save_text(INPUT_TXT, text_blob, encoding="utf-8")
-
-    cfg_value = BASELINE_CFG
-    steps_value = INFERENCE_STEPS
-
-    prompt_audio = narrator_seed["wav"]
-    prompt_text = narrator_seed["text"]
-
-    cmd = [
-        VOXCMD,
-        "--input", str(INPUT_TXT),
-        "--output-dir", str(nar_dir),
-        "--prompt-audio", str(prompt_audio),
-        "--prompt-text", prompt_text,
-        "--cfg-value", f"{cfg_value:.3f}",
-        "--inference-timesteps", str(steps_value),
-    ]
-    if USE_NORMALIZE:
-        cmd.append("--normalize")
-    if USE_DENOISE:
-        cmd.append("--denoise")
-
-    print(f"[DEBUG] VoxCPM narrator-only batch: {' '.join(cmd)}")
-    append_log(f"[VOXCPM_NARRATOR_ONLY] lines={len(pairs)}, cfg={cfg_value:.3f}, steps={steps_value}")
-    subprocess.run(cmd, check=True)
-
-    wavs = sorted(nar_dir.glob("*.wav"))
-    if len(wavs) != len(pairs):
-        raise SystemExit(
-            f"VoxCPM narrator-only mismatch: expected {len(pairs)} wavs, got {len(wavs)}"
-        )
-
-    for src, line in zip(wavs, pairs):
-        target = SOUNDS_DIR / f"{line['resref']}.wav"
-        target.parent.mkdir(parents=True, exist_ok=True)
-        src.replace(target)
-        apply_fade_in_out(target)
-        append_log(f"[GEN_NARRATOR_ONLY] {target.name} <- cfg={cfg_value:.3f}, "
-                   f"steps={steps_value}, strref={line['strref']}")
-    print(f"[DEBUG] Narrator-only generation wrote {len(pairs)} wav(s).")
+        tasks.append({
+            "role": "narrator",
+            "line": line,
+            "seg_order": 0,
+            "text": cleaned,
+            "tmp_name": f"narronly_{line.strref}.wav",
+            "wav_path": None,
+        })
+    return tasks
 
 
-def stitch_narration(lines_to_rebuild, narrator_seed, char_seed):
-    if not ENABLE_NARRATION_STITCH or narrator_seed is None or char_seed is None:
-        return
-    if not lines_to_rebuild:
+def place_narrator_only_wavs(tasks):
+    if not tasks:
         return
 
-    tasks = prepare_narration_tasks(lines_to_rebuild)
-    if not tasks:
-        print("[DEBUG] Narration stitching: no mixed narrator/character lines found.")
+    SOUNDS_DIR.mkdir(parents=True, exist_ok=True)
+    targets = []
+    log_lines = []
+    for t in tasks:
+        line = t["line"]
+        target = SOUNDS_DIR / f"{line.resref}.wav"
+        os.replace(t["wav_path"], target)
+        t["wav_path"] = None
+        targets.append(target)
+        log_lines.append(f"[GEN_NARRATOR_ONLY] {target.name} <- cfg={BASELINE_CFG:.3f}, "
+                         f"steps={INFERENCE_STEPS}, strref={line.strref}")
+    append_log("\n".join(log_lines))
+    batch_apply_fades(targets)
+    print(f"[DEBUG] Narrator-only generation wrote {len(tasks)} wav(s).")
+
+
+def synthesize_narration(narr_only_lines, lines_to_rebuild, narrator_seed, char_seed):
+    """
+    Voice pure narrator-only lines and stitch mixed narrator/character
+    lines. Every narrator-voice text (whole narrator-only lines plus the
+    narrator segments of mixed lines) shares seed, CFG and steps, so it all
+    goes to VoxCPM as a single batch.
+    """
+    if not ENABLE_NARRATION_STITCH or narrator_seed is None:
         return
 
+    only_tasks = prepare_narrator_only_tasks(narr_only_lines)
+
+    tasks = []
+    if lines_to_rebuild and char_seed is not None:
+        tasks = prepare_narration_tasks(lines_to_rebuild)
+        if not tasks:
+            print("[DEBUG] Narration stitching: no mixed narrator/character lines found.")
+
     char_tasks = [t for t in tasks if t["role"] == "character"]
     narr_tasks = [t for t in tasks if t["role"] == "narrator"]
 
     run_voxcpm_segments_batch(char_tasks, char_seed, "character")
-    run_voxcpm_segments_batch(narr_tasks, narrator_seed, "narrator")
+    run_voxcpm_segments_batch(only_tasks + narr_tasks, narrator_seed, "narrator")
+    place_narrator_only_wavs(only_tasks)
+
+    if not tasks:
+        return
 
     tasks_by_line = {}
     for t in tasks:
         if t["wav_path"] is None:
             continue
         line = t["line"]
-        sr = line["strref"]
+        sr = line.strref
         tasks_by_line.setdefault(sr, []).append(t)
 
     count = 0
     stitched_strrefs = []
 
     for line in lines_to_rebuild:
-        sr = line["strref"]
+        sr = line.strref
         segs = tasks_by_line.get(sr)
         if not segs:
             continue
         segs_sorted = sorted(segs, key=lambda x: x["seg_order"])
         wav_paths = [t["wav_path"] for t in segs_sorted]
-        out_wav = SOUNDS_DIR / f"{line['resref']}.wav"
+        out_wav = SOUNDS_DIR / f"{line.resref}.wav"
         concat_wavs(wav_paths, out_wav)
         count += 1
         stitched_strrefs.append(sr)
@@ -1666,64 +2043,68 @@ def stitch_narration(lines_to_rebuild, narrator_seed, char_seed):
 # TP2 + VIEWER METADATA/HELPER
 # ==============================
 
-def write_tp2(voiced_lines):
+def render_tp2(voiced_lines) -> str:
+    """
+    Text of setup-autovo_<dlg>.tp2. Needs only the line identities, not
+    the audio, so it can be built while synthesis is still running.
+    """
+    # One pass collects both blocks, and a single join then builds the
+    # whole file with no intermediate per-block strings.
+    copies = [
+        f'BACKUP ~{MOD_ID}/backup~\n'
+        'AUTHOR ~Auto-VO pipeline (VoxCPM CLI batch)~\n\n'
+        f'BEGIN ~Auto-VO for {DLG_BASENAME} (VoxCPM)~\n\n'
+    ]
+    string_sets = ["\n"]
+    seen_resrefs = set()
+    seen_pairs = set()
+    for line in voiced_lines:
+        strref = line.strref
+        resref = line.resref
+        if resref not in seen_resrefs:
+            seen_resrefs.add(resref)
+            copies.append(f'COPY ~{MOD_ID}/sounds/{resref}.wav~ ~override/{resref}.wav~\n')
+
+        pair = (strref, resref)
+        if pair in seen_pairs:
+            continue
+        seen_pairs.add(pair)
+
+        text = line.text.replace("\r\n", "\n")
+        safe_text = text.replace("~", "`")
+        string_sets.append(f'STRING_SET {strref} ~{safe_text}~ [{resref}]\n')
+
+    return "".join(itertools.chain(copies, string_sets))
+
+
+def write_tp2(tp2_text: str):
     MOD_DIR.mkdir(parents=True, exist_ok=True)
     (MOD_DIR / "backup").mkdir(parents=True, exist_ok=True)
 
     tp2_path = MOD_DIR / f"setup-autovo_{DLG_BASENAME.lower()}.tp2"
-
     with tp2_path.open("w", encoding="utf-8") as f:
-        f.write(f'BACKUP ~{MOD_ID}/backup~\n')
-        f.write('AUTHOR ~Auto-VO pipeline (VoxCPM CLI batch)~\n\n')
-        f.write(f'BEGIN ~Auto-VO for {DLG_BASENAME} (VoxCPM)~\n\n')
-
-        seen_resrefs = set()
-        for line in voiced_lines:
-            resref = line["resref"]
-            if resref in seen_resrefs:
-                continue
-            seen_resrefs.add(resref)
-            fname = f"{resref}.wav"
-            f.write(f'COPY ~{MOD_ID}/sounds/{fname}~ ~override/{fname}~\n')
-        f.write("\n")
-
-        seen_pairs = set()
-        for line in voiced_lines:
-            strref = line["strref"]
-            resref = line["resref"]
-            pair = (strref, resref)
-            if pair in seen_pairs:
-                continue
-            seen_pairs.add(pair)
-
-            text = line["text"].replace("\r\n", "\n")
-            safe_text = text.replace("~", "`")
-
-            f.write(f'STRING_SET {strref} ~{safe_text}~ [{resref}]\n')
+        f.write(tp2_text)
 
     print(f"Wrote TP2: {tp2_path}")
 
 
-def write_viewer_metadata(voiced_lines):
+def render_viewer_metadata(voiced_lines) -> bytes:
     """
-    Write vo_lines.json with a simple list of entries:
+    vo_lines.json contents: a simple list of entries
       { strref, resref, text, wav (relative path from MOD_DIR) }
     """
-    MOD_DIR.mkdir(parents=True, exist_ok=True)
-    meta_path = MOD_DIR / "vo_lines.json"
-
     entries = []
     seen_resrefs = set()
     for line in voiced_lines:
-        resref = line["resref"]
+        resref = line.resref
         if resref in seen_resrefs:
             continue
         seen_resrefs.add(resref)
         wav_rel = f"sounds/{resref}.wav"
         entries.append({
-            "strref": line["strref"],
+            "strref": line.strref,
             "resref": resref,
-            "text": line["text"],
+            "text": line.text,
             "wav": wav_rel,
         })
 
@@ -1734,8 +2115,13 @@ def write_viewer_metadata(voiced_lines):
         "mod_id": MOD_ID,
         "entries": entries,
     }
+    return dump_json_bytes(data)
+
 
-    meta_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+def write_viewer_metadata(meta_bytes: bytes):
+    MOD_DIR.mkdir(parents=True, exist_ok=True)
+    meta_path = MOD_DIR / "vo_lines.json"
+    meta_path.write_bytes(meta_bytes)
     print(f"[DEBUG] Wrote viewer metadata: {meta_path}")
 
 
@@ -1744,9 +2130,12 @@ def write_viewer_script():
     Drop a small Tk-based preview helper script in the mod dir:
       vo_preview.py
     """
+    if not VIEWER_SCRIPT_SRC.is_file():
+        print(f"[WARN] Viewer helper source not found, skipping: {VIEWER_SCRIPT_SRC}")
+        return
     MOD_DIR.mkdir(parents=True, exist_ok=True)
     script_path = MOD_DIR / "vo_preview.py"
-    script_path.write_text(VIEWER_SCRIPT_TEMPLATE, encoding="utf-8")
+    shutil.copy2(VIEWER_SCRIPT_SRC, script_path)
     try:
         mode = script_path.stat().st_mode
         script_path.chmod(mode | 0o111)
@@ -1763,54 +2152,62 @@ def run_for_dlg(dlg_input: str):
     if not dlg_input:
         raise SystemExit("No DLG name provided; aborting.")
     setup_dlg(dlg_input)
+    _DECOMPILED_CREATED.clear()
 
+    # The .D / .TRA we decompiled are removed however the run ends:
+    # success, an early SystemExit, or a crash / Ctrl+C mid-synthesis.
+    try:
+        _run_for_dlg()
+    finally:
+        cleanup_decompiled_sources()
+
+
+def _run_for_dlg():
+    global _SOUNDREF_TABLE_LOADED
     init_run_log()
     ensure_base_dialog_backup_and_restore()
+    tlk_soundrefs = load_tlk_soundrefs(GAME_DIR / "lang" / WEIDU_LANG / "dialog.tlk")
+    _SOUNDREF_CACHE.update(tlk_soundrefs)
+    _SOUNDREF_TABLE_LOADED = bool(tlk_soundrefs)
 
     if ENABLE_GLOBAL_TLK_DEDUP:
         ensure_tlk_traified()
-        strref_to_text, textkey_to_strrefs = parse_tlk_tra(TLK_TRA_FILE)
+        strref_to_text, strref_to_text_id, strrefs_by_text_id = parse_tlk_tra(TLK_TRA_FILE)
     else:
-        strref_to_text, textkey_to_strrefs = None, None
-
-    # First, ensure the main DLG is decompiled so we can inspect its .D source.
-    base_d_path, base_tra_path = ensure_dlg_decompiled_for(DLG_BASENAME)
+        strref_to_text, strref_to_text_id, strrefs_by_text_id = None, None, None
 
     # Discover all base+variant dialogs using WeiDU's resource listing.
+    # The base is always among them, so it is decompiled alongside the rest.
     dlg_variants = find_dlg_variants(DLG_BASENAME)
+    if len(dlg_variants) == 1:
+        variant_label = f"in {DLG_BASENAME}"
+    else:
+        variant_label = "across variants " + ", ".join(dlg_variants)
 
+    # This invokes WeiDU on each <basename>.DLG (resource from BIFF),
+    # emitting <basename>.D / <basename>.TRA into GAME_DIR if needed.
+    # Each variant is parsed as soon as its files land, overlapping with
+    # the WeiDU runs still in flight.
     all_lines = []
-    for basename in dlg_variants:
-        # This invokes WeiDU on <basename>.DLG (resource from BIFF),
-        # emitting <basename>.D / <basename>.TRA into GAME_DIR if needed.
-        d_path, tra_path = ensure_dlg_decompiled_for(basename)
+    for d_path, tra_path in decompile_all(dlg_variants):
         variant_lines = build_lines(d_path, tra_path)
         if not variant_lines:
             continue
         all_lines.extend(variant_lines)
 
     if not all_lines:
-        cleanup_decompiled_sources()
         raise SystemExit("No SAY @N lines with strrefs (after filtering) found in any DLG variant.")
 
-    lines = []
-    seen_keys = set()
+    # First line per (strref, resref) wins; setdefault keeps it and its
+    # first-seen position in a single probe.
+    unique = {}
     for line in all_lines:
-        key = (line["strref"], line["resref"])
-        if key in seen_keys:
-            continue
-        seen_keys.add(key)
-        lines.append(line)
+        unique.setdefault((line.strref, line.resref), line)
+    lines = list(unique.values())
 
-    if len(dlg_variants) == 1:
-        print(f"Found {len(lines)} SAY-lines in {DLG_BASENAME} needing new VO.")
-    else:
-        joined = ", ".join(dlg_variants)
-        print(f"Found {len(lines)} SAY-lines across variants {joined} needing new VO.")
+    print(f"Found {len(lines)} SAY-lines {variant_label} needing new VO.")
 
-    seeds = load_seeds()
-    seeds_by_key = {s["key"]: s for s in seeds}
-    char_seed_for_narration = pick_baseline_seed(seeds)
+    seeds, seeds_by_key, char_seed_for_narration = load_seeds()
     narrator_seed = load_narrator_seed()
 
     keep_lines, regen_lines, _ = plan_generation(lines, seeds)
@@ -1826,45 +2223,54 @@ def run_for_dlg(dlg_input: str):
         char_only_regen = list(regen_lines)
         mixed_regen = []
 
-    first_run = not SOUNDS_DIR.exists() or not any(SOUNDS_DIR.glob("*.wav"))
-    if first_run:
-        print("[DEBUG] No existing audio found: baseline mode enabled.")
-        baseline_seed = char_seed_for_narration
-        # Only synthesize pure character-only lines in the baseline batch;
-        # mixed lines will be handled via stitching only.
-        for line in char_only_regen:
-            line["seed_key"] = baseline_seed["key"]
-        synthesize_baseline(char_only_regen, baseline_seed, seeds_by_key)
-    else:
-        synthesize_lines_batch(char_only_regen, seeds, seeds_by_key)
-
-    # Generate pure narrator-only lines in narrator voice
-    synthesize_narrator_only_lines(narr_only_regen, narrator_seed)
-
-    # Stitch mixed narrator+character lines
-    if narrator_seed is not None and ENABLE_NARRATION_STITCH:
-        stitch_narration(mixed_regen, narrator_seed, char_seed_for_narration)
-
     # Assemble base voiced-line set (before TLK-wide dedup)
-    base_voiced = keep_lines + narr_only_regen + char_only_regen + mixed_regen
+    # One list built from all four, not three chained `+` temporaries;
+    # expand_duplicates walks it more than once, so it stays a list.
+    base_voiced = list(itertools.chain(keep_lines, narr_only_regen, char_only_regen, mixed_regen))
 
-    # TLK-wide duplicate propagation (after all audio is generated)
+    # TLK-wide duplicate propagation. Clones reuse their original's resref,
+    # so this needs no audio and can run before synthesis.
     if ENABLE_GLOBAL_TLK_DEDUP and strref_to_text is not None:
-        voiced_lines = expand_duplicates(base_voiced, strref_to_text, textkey_to_strrefs)
+        voiced_lines = expand_duplicates(base_voiced, strref_to_text, strref_to_text_id, strrefs_by_text_id)
     else:
         voiced_lines = base_voiced
 
     print(f"[DEBUG] Primary voiced lines count (all variants + TLK dedup): {len(voiced_lines)}")
     if not voiced_lines:
-        cleanup_decompiled_sources()
         raise SystemExit("No voiced lines found; nothing to write to TP2.")
 
-    write_tp2(voiced_lines)
-    write_viewer_metadata(voiced_lines)
+    # Render the TP2 / viewer metadata on a side thread while VoxCPM runs;
+    # they are only written out once synthesis has succeeded, so a failed
+    # run never leaves a TP2 pointing at WAVs that were not produced.
+    with ThreadPoolExecutor(max_workers=1) as render_pool:
+        tp2_future = render_pool.submit(render_tp2, voiced_lines)
+        meta_future = render_pool.submit(render_viewer_metadata, voiced_lines)
+        synthesize_all(
+            char_only_regen, narr_only_regen, mixed_regen,
+            seeds, seeds_by_key, char_seed_for_narration, narrator_seed,
+        )
+
+    write_tp2(tp2_future.result())
+    write_viewer_metadata(meta_future.result())
     write_viewer_script()
 
-    # Clean up any .D / .TRA we decompiled
-    cleanup_decompiled_sources()
+
+def synthesize_all(char_only_regen, narr_only_regen, mixed_regen,
+                   seeds, seeds_by_key, char_seed_for_narration, narrator_seed):
+    first_run = not has_wavs(SOUNDS_DIR)
+    if first_run:
+        print("[DEBUG] No existing audio found: baseline mode enabled.")
+        baseline_seed = char_seed_for_narration
+        # Only synthesize pure character-only lines in the baseline batch;
+        # mixed lines will be handled via stitching only.
+        for line in char_only_regen:
+            line.seed_key = baseline_seed["key"]
+        synthesize_baseline(char_only_regen, baseline_seed, seeds_by_key)
+    else:
+        synthesize_lines_batch(char_only_regen, seeds, seeds_by_key)
+
+    # Narrator-only lines in narrator voice, plus stitched narrator+character lines
+    synthesize_narration(narr_only_regen, mixed_regen, narrator_seed, char_seed_for_narration)
 
 
 
@@ -0,0 +1,92 @@
+import struct
+import sys
+import tempfile
+import unittest
+import wave
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import build_autovo  # noqa: E402
+
+
+def _chunk(chunk_id: bytes, body: bytes) -> bytes:
+    pad = b"\0" if len(body) & 1 else b""
+    return struct.pack("<4sI", chunk_id, len(body)) + body + pad
+
+
+def _write_wav(path: Path, nchannels: int, sampwidth: int, framerate: int,
+               data: bytes, extra: bytes = b""):
+    """RIFF/WAVE with `extra` chunks between fmt and data."""
+    fmt = struct.pack("<HHIIHH", 1, nchannels, framerate,
+                      framerate * nchannels * sampwidth, nchannels * sampwidth, sampwidth * 8)
+    body = b"WAVE" + _chunk(b"fmt ", fmt) + extra + _chunk(b"data", data)
+    path.write_bytes(struct.pack("<4sI", b"RIFF", len(body)) + body)
+
+
+def _reference_concat(wav_paths, out_path: Path):
+    """The wave.setparams / writeframes stitch concat_wavs replaced."""
+    with wave.open(str(wav_paths[0]), "rb") as first:
+        params = first.getparams()
+    with wave.open(str(out_path), "wb") as out:
+        out.setparams(params)
+        for p in wav_paths:
+            with wave.open(str(p), "rb") as w:
+                out.writeframes(w.readframes(w.getnframes()))
+
+
+class ConcatWavsTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        # concat_wavs fades its output; compare the stitched data alone.
+        patcher = mock.patch.object(build_autovo, "apply_fade_in_out", lambda path: None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _assert_matches_reference(self, inputs):
+        ours = self.root / "ours.wav"
+        ref = self.root / "ref.wav"
+        build_autovo.concat_wavs(inputs, ours)
+        _reference_concat(inputs, ref)
+        self.assertEqual(ours.read_bytes(), ref.read_bytes())
+        self.assertFalse((self.root / "ours.wav.part").exists())
+
+    def test_mono_with_list_chunk_and_odd_data(self):
+        a = self.root / "a.wav"
+        b = self.root / "b.wav"
+        c = self.root / "c.wav"
+        # 8-bit mono: an odd frame count gives an odd-length, padded data chunk
+        _write_wav(a, 1, 1, 16000, bytes(range(1, 102)))
+        _write_wav(b, 1, 1, 16000, bytes(range(200, 255)),
+                   extra=_chunk(b"LIST", b"INFOISFT\x05\0\0\0test\0"))
+        _write_wav(c, 1, 1, 16000, b"\x80" * 7)
+        self._assert_matches_reference([a, b, c])
+
+    def test_stereo_with_list_chunk_and_odd_data(self):
+        a = self.root / "a.wav"
+        b = self.root / "b.wav"
+        frames = struct.pack("<12h", *range(-600, 600, 100))
+        _write_wav(a, 2, 2, 22050, frames, extra=_chunk(b"LIST", b"INFOabc"))
+        # A trailing partial frame makes the data chunk odd; it is dropped.
+        _write_wav(b, 2, 2, 22050, frames[::-1] + b"\x7f")
+        self._assert_matches_reference([a, b])
+
+    def test_format_mismatch_leaves_no_output(self):
+        a = self.root / "a.wav"
+        b = self.root / "b.wav"
+        _write_wav(a, 1, 2, 16000, bytes(20))
+        _write_wav(b, 2, 2, 16000, bytes(20))
+        out = self.root / "out.wav"
+        with self.assertRaises(SystemExit):
+            build_autovo.concat_wavs([a, b], out)
+        self.assertFalse(out.exists())
+        self.assertFalse((self.root / "out.wav.part").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import build_autovo  # noqa: E402
+
+
+@unittest.skipUnless(os.name == "posix", "stand-in WeiDU is a shebang script")
+class DecompileCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.game = root / "game"
+        (self.game / "lang" / "en_us").mkdir(parents=True)
+        (self.game / "chitin.key").write_bytes(b"KEY V1  ")
+        self.tlk = self.game / "lang" / "en_us" / "dialog.tlk"
+        self.tlk.write_bytes(b"TLK V1  ")
+
+        self.calls = root / "weidu_calls.log"
+        weidu = root / "weidu"
+        weidu.write_text(textwrap.dedent(f"""\
+            #!{sys.executable}
+            import sys
+            open({str(self.calls)!r}, "a").write(" ".join(sys.argv[1:]) + "\\n")
+            name = sys.argv[-1][:-4]
+            open(name + ".D", "w").write("BEGIN ~" + name + "~\\n")
+            open(name + ".TRA", "w").write("@0 = #1 /* ~Hi~ */\\n")
+        """))
+        weidu.chmod(0o755)
+
+        patches = {
+            "GAME_DIR": self.game,
+            "WEIDU_EXE": weidu,
+            "WEIDU_LANG": "en_us",
+            "FORCE_REEXTRACT": False,
+            "DECOMPILE_CACHE_DIR": root / "autovo" / ".dlg_cache",
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(build_autovo, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        build_autovo._DECOMPILED_CREATED.clear()
+        self.addCleanup(build_autovo._DECOMPILED_CREATED.clear)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def decompile(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            d_path, tra_path = build_autovo.ensure_dlg_decompiled_for("DTEST")
+            text = tra_path.read_text()
+            build_autovo.cleanup_decompiled_sources()
+        build_autovo._DECOMPILED_CREATED.clear()
+        return text
+
+    def weidu_calls(self):
+        return len(self.calls.read_text().splitlines()) if self.calls.exists() else 0
+
+    def test_second_run_is_served_from_cache(self):
+        first = self.decompile()
+        self.assertEqual(self.weidu_calls(), 1)
+        self.assertFalse((self.game / "DTEST.TRA").exists())
+
+        self.assertEqual(self.decompile(), first)
+        self.assertEqual(self.weidu_calls(), 1)
+
+    def test_changed_tlk_invalidates_entry(self):
+        self.decompile()
+        self.tlk.write_bytes(b"TLK V1  changed")
+        self.decompile()
+        self.assertEqual(self.weidu_calls(), 2)
+
+    def test_force_reextract_bypasses_cache(self):
+        self.decompile()
+        with mock.patch.object(build_autovo, "FORCE_REEXTRACT", True):
+            self.decompile()
+        self.assertEqual(self.weidu_calls(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import random
+import sys
+import tempfile
+import unittest
+import wave
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import build_autovo  # noqa: E402
+
+FRAMERATE = 1000  # 1 frame per ms, so the fades are FADE_*_MS frames long
+NCHANNELS = 2
+NFRAMES = 60
+
+# WAV PCM is little-endian; 8-bit samples are unsigned, wider ones signed
+_SIGNED = {1: False, 2: True, 4: True}
+
+
+def _encode(samples, sampwidth):
+    return b"".join(s.to_bytes(sampwidth, "little", signed=_SIGNED[sampwidth]) for s in samples)
+
+
+def _decode(raw, sampwidth):
+    return [int.from_bytes(raw[i:i + sampwidth], "little", signed=_SIGNED[sampwidth])
+            for i in range(0, len(raw), sampwidth)]
+
+
+def _reference_fade(samples, sampwidth, fade_in, fade_out):
+    """Linear 0 -> 1 / 1 -> 0 ramp per frame, computed in double."""
+    nframes = len(samples) // NCHANNELS
+    out = []
+    for i, s in enumerate(samples):
+        frame = i // NCHANNELS
+        gain = 1.0
+        if frame < fade_in:
+            gain = frame / fade_in
+        elif frame >= nframes - fade_out:
+            gain = 1.0 - (frame - (nframes - fade_out)) / fade_out
+        if sampwidth == 1:
+            out.append(int((s - 128) * gain + 128.0))
+        else:
+            out.append(int(s * gain))
+    return out
+
+
+class FadeTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.wav = Path(self._tmp.name) / "clip.wav"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _check_width(self, sampwidth):
+        bits = sampwidth * 8
+        if sampwidth == 1:
+            lo, hi = 0, 255
+        else:
+            lo, hi = -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+        rng = random.Random(sampwidth)
+        samples = [rng.randint(lo, hi) for _ in range(NFRAMES * NCHANNELS)]
+        # full-scale extremes inside both ramps
+        samples[NCHANNELS:2 * NCHANNELS] = [lo, hi]
+        samples[-2 * NCHANNELS:-NCHANNELS] = [hi, lo]
+
+        with wave.open(str(self.wav), "wb") as w:
+            w.setnchannels(NCHANNELS)
+            w.setsampwidth(sampwidth)
+            w.setframerate(FRAMERATE)
+            w.writeframes(_encode(samples, sampwidth))
+
+        build_autovo.apply_fade_in_out(self.wav)
+
+        with wave.open(str(self.wav), "rb") as w:
+            self.assertEqual((w.getnchannels(), w.getsampwidth(), w.getframerate(), w.getnframes()),
+                             (NCHANNELS, sampwidth, FRAMERATE, NFRAMES))
+            got = _decode(w.readframes(NFRAMES), sampwidth)
+
+        fade_in = FRAMERATE * build_autovo.FADE_IN_MS // 1000
+        fade_out = FRAMERATE * build_autovo.FADE_OUT_MS // 1000
+        want = _reference_fade(samples, sampwidth, fade_in, fade_out)
+        mid = slice(fade_in * NCHANNELS, (NFRAMES - fade_out) * NCHANNELS)
+        self.assertEqual(got[mid], samples[mid])
+        for i, (g, w, s) in enumerate(zip(got, want, samples)):
+            # float32 ramp: off by at most one step, plus rounding at 32 bits
+            tolerance = 1 + abs(s) * 2 ** -22
+            self.assertLessEqual(abs(g - w), tolerance, f"sample {i}: {g} vs {w} (from {s})")
+
+    def test_8bit_unsigned(self):
+        self._check_width(1)
+
+    def test_16bit(self):
+        self._check_width(2)
+
+    def test_32bit(self):
+        self._check_width(4)
+
+
+if __name__ == "__main__":
+    unittest.main()
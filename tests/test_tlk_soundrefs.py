@@ -0,0 +1,41 @@
+import contextlib
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import build_autovo  # noqa: E402
+
+
+def _load_quietly(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return build_autovo.load_tlk_soundrefs(path)
+
+
+class LoadTlkSoundrefsTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tlk = Path(self._tmp.name) / "dialog.tlk"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_empty_file_falls_back(self):
+        self.tlk.write_bytes(b"")
+        self.assertEqual(_load_quietly(self.tlk), {})
+
+    def test_reads_sound_resrefs(self):
+        entries = [b"MO000001", b""]
+        header = build_autovo._TLK_HEADER.pack(b"TLK ", b"V1  ", 0, len(entries), 0)
+        table = b"".join(
+            build_autovo._TLK_ENTRY.pack(0, resref.ljust(8, b"\0")) for resref in entries
+        )
+        self.tlk.write_bytes(header + table)
+        self.assertEqual(_load_quietly(self.tlk), {0: "MO000001", 1: None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import contextlib
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import build_autovo  # noqa: E402
+
+
+def _parse_quietly(parser, path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser(path)
+
+
+class WeiduTextNewlineTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_parse_tra_folds_crlf(self):
+        tra = self.tmp / "DTEST.TRA"
+        tra.write_bytes(
+            b"@0 = #100 /* ~Hello\r\nthere~ */\r\n"
+            b"@1 = #101 /* ~Lone\rcr~ */\r\n"
+        )
+        tra_map = _parse_quietly(build_autovo.parse_tra, tra)
+        self.assertEqual(tra_map[0]["text"], "Hello\nthere")
+        self.assertEqual(tra_map[1]["text"], "Lone\ncr")
+        self.assertEqual(tra_map[0]["strref"], 100)
+
+    def test_parse_tlk_tra_folds_crlf(self):
+        tlk_tra = self.tmp / "dialog_full.tra"
+        tlk_tra.write_bytes(
+            b"@0 = ~Two\r\nlines~\r\n"
+            b"@1 = ~Two\nlines~\r\n"
+            b"@2 = ~Other~\r\n"
+        )
+        strref_to_text, strref_to_text_id, strrefs_by_text_id = _parse_quietly(
+            build_autovo.parse_tlk_tra, tlk_tra
+        )
+        self.assertEqual(strref_to_text[0], "Two\nlines")
+        self.assertEqual(strref_to_text_id[0], strref_to_text_id[1])
+        self.assertEqual(strrefs_by_text_id[strref_to_text_id[0]], [0, 1])
+        self.assertEqual(strrefs_by_text_id[strref_to_text_id[2]], [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+import json
+import os
+import sys
+import pathlib
+import platform
+import subprocess
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+HERE = pathlib.Path(__file__).resolve().parent
+META_PATH = HERE / "vo_lines.json"
+
+def load_metadata():
+    if not META_PATH.is_file():
+        messagebox.showerror("Error", f"Metadata file not found: {META_PATH}")
+        sys.exit(1)
+    with META_PATH.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+def play_wav(path):
+    path = str(path)
+    if not os.path.isfile(path):
+        messagebox.showerror("Playback error", f"WAV not found: {path}")
+        return
+    system = platform.system()
+    if system == "Windows":
+        try:
+            import winsound
+            winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+            return
+        except Exception as e:
+            messagebox.showerror("Playback error", str(e))
+            return
+    else:
+        for cmd in (["aplay", path], ["paplay", path], ["ffplay", "-nodisp", "-autoexit", path]):
+            try:
+                subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                return
+            except FileNotFoundError:
+                continue
+        messagebox.showerror("Playback error", "No suitable audio player found (tried aplay, paplay, ffplay).")
+
+def main():
+    try:
+        data = load_metadata()
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to load metadata: {e}")
+        return
+
+    entries = data.get("entries", [])
+    root = tk.Tk()
+    root.title(f"Auto-VO Preview - {data.get('dlg_basename', '')}")
+
+    main_frame = ttk.Frame(root, padding=10)
+    main_frame.grid(row=0, column=0, sticky="nsew")
+    root.rowconfigure(0, weight=1)
+    root.columnconfigure(0, weight=1)
+
+    list_frame = ttk.Frame(main_frame)
+    list_frame.grid(row=0, column=0, sticky="nsew")
+    main_frame.rowconfigure(0, weight=1)
+    main_frame.columnconfigure(0, weight=1)
+
+    listbox = tk.Listbox(list_frame, height=20, exportselection=False)
+    scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=listbox.yview)
+    listbox.configure(yscrollcommand=scrollbar.set)
+    listbox.grid(row=0, column=0, sticky="nsew")
+    scrollbar.grid(row=0, column=1, sticky="ns")
+    list_frame.rowconfigure(0, weight=1)
+    list_frame.columnconfigure(0, weight=1)
+
+    detail = tk.Text(main_frame, width=80, height=8, wrap="word")
+    detail.grid(row=1, column=0, sticky="ew", pady=(8, 0))
+
+    btn_frame = ttk.Frame(main_frame)
+    btn_frame.grid(row=2, column=0, sticky="ew", pady=(8, 0))
+    btn_frame.columnconfigure(0, weight=0)
+    btn_frame.columnconfigure(1, weight=1)
+
+    def populate():
+        listbox.delete(0, tk.END)
+        for idx, entry in enumerate(entries):
+            txt = (entry.get("text") or "").replace("\n", " ")
+            if len(txt) > 80:
+                txt = txt[:77] + "..."
+            label = f"{idx+1:03d} | {entry.get('resref')} | strref {entry.get('strref')} | {txt}"
+            listbox.insert(tk.END, label)
+
+    def on_select(event=None):
+        sel = listbox.curselection()
+        if not sel:
+            return
+        entry = entries[sel[0]]
+        text = entry.get("text") or ""
+        detail.delete("1.0", tk.END)
+        detail.insert("1.0", text)
+
+    def on_play():
+        sel = listbox.curselection()
+        if not sel:
+            messagebox.showinfo("No selection", "Select a line to play.")
+            return
+        entry = entries[sel[0]]
+        wav_rel = entry.get("wav")
+        if not wav_rel:
+            messagebox.showerror("Playback error", "No WAV path in metadata.")
+            return
+        wav_path = HERE / wav_rel
+        play_wav(wav_path)
+
+    listbox.bind("<<ListboxSelect>>", on_select)
+    listbox.bind("<Double-Button-1>", lambda e: on_play())
+
+    play_btn = ttk.Button(btn_frame, text="Play", command=on_play)
+    play_btn.grid(row=0, column=0, sticky="w")
+
+    populate()
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()